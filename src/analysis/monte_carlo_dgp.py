@@ -1,9 +1,12 @@
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.arima_process import arma_generate_sample
 
+from src.model_code.panel_regressors import PanelRegressors
 
-def dgp_time_invariant_fixed_effects_model(T, N, *, beta1, beta2, **kw):
+
+def dgp_time_invariant_fixed_effects_model(
+    T, N, *, beta1, beta2, rng=None, nsims=None, compact=False, **kw
+):
     r"""
     Data generating process for "Interactive Fixed Effects Model with Common
     Regressors and Time-invariant Regressors"
@@ -18,6 +21,14 @@ def dgp_time_invariant_fixed_effects_model(T, N, *, beta1, beta2, **kw):
         Coefficient of x1
     beta2 : float
         Coefficient of x2
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -26,6 +37,9 @@ def dgp_time_invariant_fixed_effects_model(T, N, *, beta1, beta2, **kw):
         entity).
     Y : array-like
         Simulate data of dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -42,24 +56,30 @@ def dgp_time_invariant_fixed_effects_model(T, N, *, beta1, beta2, **kw):
 
     """
 
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
     p = 2
     mu = 0
     gamma = 0
     delta = 0
-    factor = np.tile([1, 0], (T, 1))
-    lambda_ = np.hstack(
-        (np.random.normal(loc=0, scale=1, size=(N, 1)), np.ones(shape=(N, 1)))
+    factor = np.broadcast_to([1.0, 0.0], (*batch, T, 2))
+    lambda_ = np.concatenate(
+        (rng.normal(loc=0, scale=1, size=(*batch, N, 1)), np.ones((*batch, N, 1))),
+        axis=-1,
     )
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p, compact
     )
-    X = X[0:p, :, :]
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
-def dgp_additive_fixed_effects_model(T, N, *, beta1, beta2, **kw):
+def dgp_additive_fixed_effects_model(
+    T, N, *, beta1, beta2, rng=None, nsims=None, compact=False, **kw
+):
     r"""
     Data generating process for "Interactive Fixed Effects Model with Common
     Regressors and Time-invariant Regressors"
@@ -74,6 +94,14 @@ def dgp_additive_fixed_effects_model(T, N, *, beta1, beta2, **kw):
         Coefficient of x1
     beta2 : float
         Coefficient of x2
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -82,6 +110,9 @@ def dgp_additive_fixed_effects_model(T, N, *, beta1, beta2, **kw):
         entity).
     Y : array-like
         Simulate data of dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -104,26 +135,33 @@ def dgp_additive_fixed_effects_model(T, N, *, beta1, beta2, **kw):
     .. math::
         \epsilon_{it} \stackrel{\text{i.i.d}}{\sim}N(0,4).
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
     p = 2
     mu = 0
     gamma = 0
     delta = 0
-    factor = np.hstack(
-        (np.ones(shape=(T, 1)), np.random.normal(loc=0, scale=1, size=(T, 1)))
+    factor = np.concatenate(
+        (np.ones((*batch, T, 1)), rng.normal(loc=0, scale=1, size=(*batch, T, 1))),
+        axis=-1,
     )
-    lambda_ = np.hstack(
-        (np.random.normal(loc=0, scale=1, size=(N, 1)), np.ones(shape=(N, 1)))
+    lambda_ = np.concatenate(
+        (rng.normal(loc=0, scale=1, size=(*batch, N, 1)), np.ones((*batch, N, 1))),
+        axis=-1,
     )
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p, compact
     )
-    X = X[0:p, :, :]
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
-def dgp_interactive_fixed_effects_model(T, N, *, beta1, beta2, mu, **kw):
+def dgp_interactive_fixed_effects_model(
+    T, N, *, beta1, beta2, mu, rng=None, nsims=None, compact=False, **kw
+):
     r"""
     Data generating process for "Interactive Fixed Effects Model"
 
@@ -139,6 +177,14 @@ def dgp_interactive_fixed_effects_model(T, N, *, beta1, beta2, mu, **kw):
         Coefficient of x2
     mu : float
         Constant
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -147,6 +193,9 @@ def dgp_interactive_fixed_effects_model(T, N, *, beta1, beta2, mu, **kw):
         entity).
     Y : array-like
         Simulate data of dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -174,22 +223,25 @@ def dgp_interactive_fixed_effects_model(T, N, *, beta1, beta2, mu, **kw):
     .. math::
         \epsilon_{it} \stackrel{\text{i.i.d}}{\sim}N(0,4).
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
     p = 3
     gamma = 0
     delta = 0
-    factor = np.random.normal(loc=0, scale=1, size=(T, 2))
-    lambda_ = np.random.normal(loc=0, scale=1, size=(N, 2))
+    factor = rng.normal(loc=0, scale=1, size=(*batch, T, 2))
+    lambda_ = rng.normal(loc=0, scale=1, size=(*batch, N, 2))
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p, compact
     )
-    X = X[0:p, :, :]
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
 def dgp_interactive_fixed_effects_model_with_common_and_time_invariant(
-    T, N, *, beta1, beta2, mu, gamma, delta, **kw
+    T, N, *, beta1, beta2, mu, gamma, delta, rng=None, nsims=None, compact=False, **kw
 ):
     r"""
     Data generating process for "Interactive Fixed Effects Model with Common
@@ -211,6 +263,14 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant(
         Coefficient of x_i
     delta : float
         Coefficient of w_t
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -219,6 +279,9 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant(
         entity).
     Y : array-like
         Simulate data of dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -253,82 +316,123 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant(
     so that :math:`x_{i}` is correlated with :math:`\lambda_i` and :math:`w_t` is
     correlated with :math:`f_t`.
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
-    factor = np.random.normal(loc=0, scale=1, size=(T, 2))
-    lambda_ = np.random.normal(loc=0, scale=1, size=(N, 2))
+    factor = rng.normal(loc=0, scale=1, size=(*batch, T, 2))
+    lambda_ = rng.normal(loc=0, scale=1, size=(*batch, N, 2))
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, compact=compact
     )
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
-def _dgp_fixed_effect_panel_data(T, N, beta1, beta2, mu, gamma, delta, factor, lambda_):
+def _dgp_fixed_effect_panel_data(
+    T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p=5, compact=False
+):
+    """
+    Regressors and dependent variable of the models. factor (..., T, 2) and lambda_
+    (..., N, 2) may have a leading simulation axis, which X (..., p, T, N) and Y
+    (..., T, N) get as well. X holds the first p of the regressors x1, x2, the
+    constant, x_i and w_t, as `PanelRegressors` if compact. The entity and time
+    components are broadcast instead of tiled.
+    """
     # Set parameters
-    iota = np.array([[1], [1]])
     mu1 = mu2 = c1 = c2 = 1
+    batch = factor.shape[:-2]
+    if compact and batch:
+        raise ValueError("compact regressors are only available for a single panel")
     # Generate variables
-    eta_1 = np.random.normal(loc=0, scale=1, size=(T, N))
-    eta_2 = np.random.normal(loc=0, scale=1, size=(T, N))
-    eps = np.random.normal(loc=0, scale=2, size=(T, N))
-    e = np.random.normal(loc=0, scale=1, size=(1, N))
-    eta = np.random.normal(loc=0, scale=1, size=(T, 1))
+    eta_1 = rng.normal(loc=0, scale=1, size=(*batch, T, N))
+    eta_2 = rng.normal(loc=0, scale=1, size=(*batch, T, N))
+    eps = rng.normal(loc=0, scale=2, size=(*batch, T, N))
+    e = rng.normal(loc=0, scale=1, size=(*batch, 1, N))
+    eta = rng.normal(loc=0, scale=1, size=(*batch, T, 1))
     # Calculate intermediate variables
-    iota_lambda = lambda_.dot(iota).T
-    iota_factor = factor.dot(iota)
-    lambda_factor = factor.dot(lambda_.T)
+    iota_lambda = lambda_.sum(axis=-1)[..., np.newaxis, :]
+    iota_factor = factor.sum(axis=-1)[..., np.newaxis]
+    lambda_factor = np.matmul(factor, np.swapaxes(lambda_, -1, -2))
     x = iota_lambda + e
     w = iota_factor + eta
     # Simulate data
-    X_1 = (
-        mu1
-        + c1 * lambda_factor
-        + np.tile(iota_lambda, (T, 1))
-        + np.tile(iota_factor, (1, N))
-        + eta_1
-    )
-    X_2 = (
-        mu2
-        + c2 * lambda_factor
-        + np.tile(iota_lambda, (T, 1))
-        + np.tile(iota_factor, (1, N))
-        + eta_2
-    )
-    X_3 = np.ones(shape=(T, N))
-    X_4 = np.tile(x, (T, 1))
-    X_5 = np.tile(w, (1, N))
-    X = np.stack([X_1, X_2, X_3, X_4, X_5])
-    Y = (
-        beta1 * X_1
-        + beta2 * X_2
-        + mu * X_3
-        + gamma * X_4
-        + delta * X_5
-        + lambda_factor
-        + eps
-    )
+    X_1 = mu1 + c1 * lambda_factor + iota_lambda + iota_factor + eta_1
+    X_2 = mu2 + c2 * lambda_factor + iota_lambda + iota_factor + eta_2
+    Y = beta1 * X_1 + beta2 * X_2 + mu + gamma * x + delta * w + lambda_factor + eps
+    if compact:
+        columns = [
+            ("full", X_1),
+            ("full", X_2),
+            ("constant", 1),
+            ("entity", x.ravel()),
+            ("time", w.ravel()),
+        ]
+        return PanelRegressors(columns[0:p], T, N), Y
+    X_3 = np.ones(shape=(*batch, T, N))
+    X_4 = np.broadcast_to(x, (*batch, T, N))
+    X_5 = np.broadcast_to(w, (*batch, T, N))
+    X = np.stack([X_1, X_2, X_3, X_4, X_5][0:p], axis=-3)
     return X, Y
 
 
 def _ndarray_to_panel_df(X, Y):
-    p = X.shape[0]
-    T = X.shape[1]
-    N = X.shape[2]
-    x = [pd.Series(X[i, :, :].T.ravel()) for i in range(p)]
-    y = pd.Series(Y.T.ravel())
-    year = pd.Series(np.tile(range(T), N))
-    nr = pd.Series(np.repeat(range(N), T))
-    panel_df = pd.concat([nr, year, y, *x], axis=1)
-    panel_df.set_axis(
-        ["nr", "year", "y"] + ["x" + str(i + 1) for i in range(p)],
-        axis="columns",
-        inplace=True,
+    """
+    Long-format data frame of X and Y with columns y, x1, ..., xp, indexed by (nr,
+    year). The variables are copied once into one entity-major block, which the data
+    frame uses without copying.
+    """
+    p, T, N = X.shape
+    block = np.concatenate([Y[np.newaxis], np.asarray(X)])
+    block = block.transpose(0, 2, 1).reshape(p + 1, N * T)
+    index = pd.MultiIndex.from_product([range(N), range(T)], names=["nr", "year"])
+    return pd.DataFrame(
+        block.T,
+        index=index,
+        columns=["y"] + ["x" + str(i + 1) for i in range(p)],
+        copy=False,
     )
-    panel_df.set_index(["nr", "year"], inplace=True)
-    return panel_df
 
 
-def dgp_additive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, **kw):
+class LazyPanelFrame:
+    """
+    Long-format panel data frame of simulated X and Y, built on first access. Attribute
+    and item access, e.g. `panel_df.y` or `panel_df[["x1", "x2"]]`, are forwarded to
+    the data frame, which is also available as `frame`. Only the arrays are pickled.
+    """
+
+    def __init__(self, X, Y):
+        self._arrays = (X, Y)
+        self._frame = None
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            self._frame = _ndarray_to_panel_df(*self._arrays)
+        return self._frame
+
+    def __getattr__(self, name):
+        if name in ("_arrays", "_frame"):
+            raise AttributeError(name)
+        return getattr(self.frame, name)
+
+    def __getitem__(self, key):
+        return self.frame[key]
+
+    def __len__(self):
+        return self._arrays[1].size
+
+    def __getstate__(self):
+        return {"_arrays": self._arrays, "_frame": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+def dgp_additive_fixed_effects_model_no_iid(
+    T, N, *, beta1, beta2, rng=None, nsims=None, compact=False, **kw
+):
     r"""
     Monte carlo data generate processor for "Interactive Fixed Effects Model with Common
     Regressors and Time-invariant Regressors"
@@ -343,6 +447,14 @@ def dgp_additive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, **kw):
         Coefficient of x1
     beta2 : float
         Coefficient of x2
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -351,6 +463,9 @@ def dgp_additive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, **kw):
         entity).
     Y : array-like
         Simulate data of Dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -378,32 +493,41 @@ def dgp_additive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, **kw):
     .. math::
         \epsilon_{it} \stackrel{\text{i.i.d}}{\sim}N(0,4).
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
     p = 2
     mu = 0
     gamma = 0
     delta = 0
-    factor = np.hstack(
+    factor = np.concatenate(
         (
-            np.ones(shape=(T, 1)),
-            arma_generate_sample(ar=[1, 0.7], ma=[1], nsample=(T, 1)),
-        )
+            np.ones((*batch, T, 1)),
+            generate_arma_sample(
+                ar=[1, 0.7], ma=[1], nsample=(*batch, T, 1), rng=rng, axis=len(batch)
+            ),
+        ),
+        axis=-1,
     )
-    lambda_ = np.hstack(
+    lambda_ = np.concatenate(
         (
-            np.random.normal(loc=0, scale=1, size=(N, 1)),
-            np.ones(shape=(N, 1)),
-        )
+            rng.normal(loc=0, scale=1, size=(*batch, N, 1)),
+            np.ones((*batch, N, 1)),
+        ),
+        axis=-1,
     )
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p, compact
     )
-    X = X[0:p, :, :]
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
-def dgp_interactive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, mu, **kw):
+def dgp_interactive_fixed_effects_model_no_iid(
+    T, N, *, beta1, beta2, mu, rng=None, nsims=None, compact=False, **kw
+):
     r"""
     Monte carlo data generate processor for "Interactive Fixed Effects Model"
 
@@ -419,6 +543,14 @@ def dgp_interactive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, mu, **kw):
         Coefficient of x2
     mu : float
         Constant
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -427,6 +559,9 @@ def dgp_interactive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, mu, **kw):
         entity).
     Y : array-like
         Simulate data of Dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -460,22 +595,27 @@ def dgp_interactive_fixed_effects_model_no_iid(T, N, *, beta1, beta2, mu, **kw):
     .. math::
         \epsilon_{it} \stackrel{\text{i.i.d}}{\sim}N(0,4).
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
     p = 3
     gamma = 0
     delta = 0
-    factor = arma_generate_sample(ar=[1, 0.7], ma=[1], nsample=(T, 2))
-    lambda_ = np.random.normal(loc=0, scale=1, size=(N, 2))
+    factor = generate_arma_sample(
+        ar=[1, 0.7], ma=[1], nsample=(*batch, T, 2), rng=rng, axis=len(batch)
+    )
+    lambda_ = rng.normal(loc=0, scale=1, size=(*batch, N, 2))
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, p, compact
     )
-    X = X[0:p, :, :]
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
 def dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid(
-    T, N, *, beta1, beta2, mu, gamma, delta, **kw
+    T, N, *, beta1, beta2, mu, gamma, delta, rng=None, nsims=None, compact=False, **kw
 ):
     r"""
     Monte carlo data generate processor for "Interactive Fixed Effects Model with Common
@@ -497,6 +637,14 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid(
         Coefficient of x_i
     delta : float
         Coefficient of w_t
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    nsims : int, optional
+        Number of panels drawn at once. If given, X and Y are stacks of nsims panels
+        of shape (nsims, p, T, N) and (nsims, T, N) and no panel_df is returned.
+    compact : bool, optional
+        Return X of a single panel as `src.model_code.panel_regressors.PanelRegressors`,
+        which stores the constant, time-invariant and common regressors compactly.
 
     Returns
     -------
@@ -505,6 +653,9 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid(
         entity).
     Y : array-like
         Simulate data of Dependent (left-hand-side) variable (time by entity).
+    panel_df : LazyPanelFrame
+        Long-format data frame of X and Y indexed by entity (nr) and time (year),
+        built on first access.
 
     Notes
     -----
@@ -544,24 +695,81 @@ def dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid(
     so that :math:`x_{i}` is correlated with :math:`\lambda_i` and :math:`w_t` is
     correlated with :math:`f_t`.
     """
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
     # Set parameters
-    factor = arma_generate_sample(ar=[1, 0.7], ma=[1], nsample=(T, 2))
-    lambda_ = np.random.normal(loc=0, scale=1, size=(N, 2))
+    factor = generate_arma_sample(
+        ar=[1, 0.7], ma=[1], nsample=(*batch, T, 2), rng=rng, axis=len(batch)
+    )
+    lambda_ = rng.normal(loc=0, scale=1, size=(*batch, N, 2))
     X, Y = _dgp_fixed_effect_panel_data(
-        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_
+        T, N, beta1, beta2, mu, gamma, delta, factor, lambda_, rng, compact=compact
     )
-    panel_df = _ndarray_to_panel_df(X, Y)
+    if nsims is not None:
+        return X, Y
+    panel_df = LazyPanelFrame(X, Y)
     return X, Y, panel_df
 
 
-def dgp_random_iid_residual(N, T, r):
+def generate_arma_sample(ar, ma, nsample, rng=None, scale=1, axis=0, burnin=0):
+    """
+    Simulate many ARMA series at once by filtering normal innovations with
+    `scipy.signal.lfilter`.
+
+    Parameters
+    ----------
+    ar : array-like
+        Lag polynomial of the autoregressive part including the zero lag, with the
+        sign convention of statsmodels, e.g. [1, 0.7] for
+        :math:`x_t = -0.7 x_{t-1} + e_t`.
+    ma : array-like
+        Lag polynomial of the moving average part including the zero lag.
+    nsample : int or tuple
+        Shape of the sample.
+    rng : numpy.random.Generator, SeedSequence or int, optional
+        Random number generator or its seed, passed to `numpy.random.default_rng`.
+    scale : float, optional
+        Standard deviation of the innovations.
+    axis : int, optional
+        Time axis of the sample, the other axes hold independent series.
+    burnin : int, optional
+        Number of leading observations of every series which are simulated and
+        dropped, so that the series start close to the stationary distribution
+        instead of at zero.
+
+    Returns
+    -------
+    sample : array-like
+        Simulated series of shape nsample. Drawn from the same innovations as
+        `statsmodels.tsa.arima_process.arma_generate_sample` with
+        distrvs=rng.standard_normal.
+    """
+    # imported here, scipy.signal is only needed by the no-iid models
+    from scipy.signal import lfilter
+
+    rng = np.random.default_rng(rng)
+    shape = list(np.atleast_1d(nsample))
+    axis = axis % len(shape)
+    shape[axis] += burnin
+    eta = scale * rng.standard_normal(size=tuple(shape))
+    sample = lfilter(ma, ar, eta, axis=axis)
+    keep = [slice(None)] * len(shape)
+    keep[axis] = slice(burnin, None)
+    return sample[tuple(keep)]
+
+
+def dgp_random_iid_residual(N, T, r, rng=None, nsims=None):
     """
     Data generating process for random distributed residual.\\
     Residual = Y - beta * X = Lambda * Factor + eps\\
-    Shape of residual is (N, T).
+    Shape of residual is (N, T), or (nsims, N, T) for a stack of nsims residuals drawn
+    at once. rng is a random number generator or its seed, passed to
+    `numpy.random.default_rng`.
     """
-    lambda_ = np.random.normal(loc=0, scale=1, size=(r, N))
-    f = np.random.normal(loc=0, scale=1, size=(r, T))
-    eps = np.random.normal(loc=0, scale=1, size=(N, T))
-    residual = lambda_.T.dot(f) + eps * np.sqrt(r)
+    rng = np.random.default_rng(rng)
+    batch = () if nsims is None else (nsims,)
+    lambda_ = rng.normal(loc=0, scale=1, size=(*batch, r, N))
+    f = rng.normal(loc=0, scale=1, size=(*batch, r, T))
+    eps = rng.normal(loc=0, scale=1, size=(*batch, N, T))
+    residual = np.matmul(np.swapaxes(lambda_, -1, -2), f) + eps * np.sqrt(r)
     return residual
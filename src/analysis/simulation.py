@@ -1,5 +1,4 @@
 import functools
-import multiprocessing
 
 import numpy as np
 import pandas as pd
@@ -8,6 +7,8 @@ from linearmodels.panel import PooledOLS
 from scipy.stats import norm
 
 from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+from src.model_code.parallel import make_pool
+from src.model_code.parallel import resolve_thread_split
 from src.model_code.statistics import caculate_rmse
 from src.model_code.utils import paste
 
@@ -23,6 +24,11 @@ def simulation_coefficient(
     r=2,
     interactive_start_value_effect="pooling",
     within_effect="twoways",
+    max_iter=10000,
+    max_time=None,
+    processes=None,
+    blas_threads=None,
+    seed=None,
     **beta_true
 ):
     """
@@ -37,7 +43,9 @@ def simulation_coefficient(
     all_T : array-like
         Different sample sizes of time
     nsims : int
-        Simulation times under the same N and T
+        Simulation times under the same N and T. Every simulation draws one panel
+        from its own seed stream (see seed), so the batched draws of the DGPs (their
+        option nsims) are not used here.
     need_sde : bool
         Flag the sde caculation conditions
     tolerance : float, optional
@@ -50,6 +58,25 @@ def simulation_coefficient(
     within_effect : string, optional
         The effects used in package linearmodels for within estimator, one of "twoways",
         "individual"
+    max_iter : int, optional
+        Maximum number of iterations of the interactive fixed effect estimator.
+    max_time : float, optional
+        Wall-clock budget in seconds of the interactive fixed effect estimator for one
+        simulation.
+    processes : int, optional
+        Number of worker processes.
+    blas_threads : int, optional
+        Number of BLAS/LAPACK threads of every worker process. If only one of
+        processes and blas_threads is given, the other one takes the remaining cores.
+        If none is given, the split is chosen from the largest (N, T) by
+        `src.model_code.parallel.choose_thread_split`.
+    seed : int or numpy.random.SeedSequence, optional
+        Seed of the simulation. The simulation of row `case` of the (T, N, sim) grid
+        draws its data from the child seed sequence `case` of it, i.e. the one at
+        position `case` of `SeedSequence(seed).spawn(...)`, so the results do not depend
+        on the number of processes or the order in which the cases run, and parts of
+        the grid can be simulated separately. Fresh entropy from the operating system if
+        None.
     beta_true : float
         Coefficient of variables used in dgp_func. Values in ("beta1", "beta2", "mu",
         "gamma", "delta")
@@ -58,7 +85,8 @@ def simulation_coefficient(
     -------
     df_sim_result : DataFrame
         Columns are T, N, sim, beta_interactive, beta_within, sde_interactive,
-        sde_within
+        sde_within, converged_interactive. The last one flags whether the interactive
+        fixed effect estimator converged within max_iter and max_time.
     """
 
     assert len(all_N) == len(all_T), "all_N and all_T must has same length"
@@ -79,38 +107,54 @@ def simulation_coefficient(
             "sim": np.tile(range(nsims), len(all_N)),
         }
     )
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
     sim_one_case_partial = functools.partial(
         _sim_one_case,
         T_N_sim=T_N_sim,
+        seed_sequence=seed,
         dgp_func=dgp_func,
         need_sde=need_sde,
         tolerance=tolerance,
         r=r,
         interactive_start_value_effect=interactive_start_value_effect,
         within_effect=within_effect,
+        max_iter=max_iter,
+        max_time=max_time,
+    )
+    processes, blas_threads = resolve_thread_split(
+        processes, blas_threads, all_N, all_T, len(T_N_sim)
     )
-    cores = multiprocessing.cpu_count()
-    with multiprocessing.Pool(cores) as p:
+    with make_pool(processes, blas_threads) as p:
         data = p.map(sim_one_case_partial, range(len(T_N_sim)))
     df_sim_result = pd.concat(data, axis=1).T
     df_sim_result["T"] = df_sim_result["T"].astype("int32")
     df_sim_result["N"] = df_sim_result["N"].astype("int32")
     df_sim_result["sim"] = df_sim_result["sim"].astype("int32")
+    df_sim_result["converged_interactive"] = df_sim_result[
+        "converged_interactive"
+    ].astype("bool")
     return df_sim_result
 
 
 def _sim_one_case(
     case,
     T_N_sim,
+    seed_sequence,
     dgp_func,
     need_sde,
     tolerance,
     r,
     interactive_start_value_effect,
     within_effect,
+    max_iter,
+    max_time,
 ):
-    # gerate simulation data
-    X, Y, panel_df = dgp_func(T_N_sim.loc[case, "T"], T_N_sim.loc[case, "N"])
+    # gerate simulation data from the child seed sequence of this case
+    rng = np.random.default_rng(_child_seed_sequence(seed_sequence, case))
+    X, Y, panel_df = dgp_func(
+        T_N_sim.loc[case, "T"], T_N_sim.loc[case, "N"], rng=rng, compact=True
+    )
     p = X.shape[0]
     # within model require no collinear variable combinations
     no_collinear_x_var = ["x" + str(i + 1) for i in range(min(p, 3))]
@@ -138,7 +182,14 @@ def _sim_one_case(
         beta_hat_list,
         f_hat,
         lambda_hat,
-    ) = interactive_estimator.fit(r, interactive_start_value, tolerance)
+    ) = interactive_estimator.fit(
+        r,
+        interactive_start_value,
+        tolerance,
+        max_iter=max_iter,
+        max_time=max_time,
+        history="off",
+    )
     # run within estimator with the same data
     if within_effect == interactive_start_value_effect:
         within_result = start_value_result
@@ -178,6 +229,7 @@ def _sim_one_case(
             *beta_hat_within,
             *sde_interactive,
             *sde_within,
+            float(interactive_estimator.convergence.converged),
         ],
         index=[
             "T",
@@ -187,16 +239,30 @@ def _sim_one_case(
             *paste("beta_within", range(1, p + 1), sep="."),
             *paste("sde_interactive", range(1, p + 1), sep="."),
             *paste("sde_within", range(1, p + 1), sep="."),
+            "converged_interactive",
         ],
     )
     return one_sim_result
 
 
+def _child_seed_sequence(seed_sequence, i):
+    """
+    Child i of a seed sequence, the same as `seed_sequence.spawn(i + 1)[i]` on a
+    sequence which has not spawned yet, without spawning the children before it.
+    """
+    return np.random.SeedSequence(
+        seed_sequence.entropy,
+        spawn_key=(*seed_sequence.spawn_key, i),
+        pool_size=seed_sequence.pool_size,
+    )
+
+
 def statistics_coefficient(all_N, all_T, nsims, df_sim_result, **beta_true):
     """
     Generate statistics of each N & T, take the mean of different simulations, and
     store them in a data frame. We include mean, bias, the RMSE, standard error and
-    cofidence interval in our statistical results.
+    cofidence interval in our statistical results, and the number of simulations in
+    which the interactive fixed effect estimator did not converge.
 
     Parameters
     ----------
@@ -240,6 +306,7 @@ def statistics_coefficient(all_N, all_T, nsims, df_sim_result, **beta_true):
             *paste("ci_l_within", range(1, p + 1), sep="."),
             *paste("ci_u_within", range(1, p + 1), sep="."),
             *paste("rmse_within", range(1, p + 1), sep="."),
+            "nonconverged_interactive",
         ],
     )
 
@@ -302,4 +369,8 @@ def statistics_coefficient(all_N, all_T, nsims, df_sim_result, **beta_true):
             caculate_rmse(get_sim("beta_interactive"), beta_true_list),
         )
         set_stat("rmse_within", caculate_rmse(get_sim("beta_within"), beta_true_list))
+        if "converged_interactive" in df_sim_result.columns:
+            df_statistic.loc[i, "nonconverged_interactive"] = (
+                ~df_sim_result["converged_interactive"].iloc[row_range_df_sim]
+            ).sum()
     return df_statistic
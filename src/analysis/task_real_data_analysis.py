@@ -69,14 +69,12 @@ def task_real_data_coefficient(depends_on, produces):
         }
     )
     df_range_r.iloc[0, 1:] = pool_result.params.to_list()
+    # fit all numbers of factors in one path, each started from pooled OLS
+    path = interactive_estimator.fit_path(
+        all_r, interactive_start_value, tolerance, warm_start=False
+    )
     for i in range(len(all_r)):
-        (
-            interactive_beta_hat,
-            beta_hat_list,
-            f_hat,
-            lambda_hat,
-        ) = interactive_estimator.fit(all_r[i], interactive_start_value, tolerance)
-        df_range_r.iloc[i + 1, 1:] = interactive_beta_hat
+        df_range_r.iloc[i + 1, 1:] = path[i].beta_hat
     # save result to output
     df_range_r.to_csv(produces["interactive"], index=False)
 
@@ -1,6 +1,5 @@
 import json
 
-import numpy as np
 import pytask
 
 """ These three functions are used via `globals()`. They are not unused functions. """
@@ -35,7 +34,6 @@ from src.config import SRC
 def task_simulation_ari_dgp(depends_on, produces):
     simulate = json.loads(depends_on.read_text(encoding="utf-8"))
 
-    np.random.seed(simulate["rng_seed"])
     dgp_func = globals()[simulate["dgp_func"]]
     # Run the monte carlo simulation
     df_sim_result = simulation_coefficient(
@@ -48,6 +46,7 @@ def task_simulation_ari_dgp(depends_on, produces):
         r=simulate["r"],
         interactive_start_value_effect=simulate["interactive_start_value_effect"],
         within_effect=simulate["within_effect"],
+        seed=simulate["rng_seed"],
         **simulate["beta_true"],
     )
     # Store df_sim_result with locations after each round
@@ -39,11 +39,12 @@ def task_simulation_and_statistics_range_r(depends_on, produces):
     simulate = json.loads(depends_on.read_text(encoding="utf-8"))
     dgp_func = globals()[simulate["dgp_func"]]
     all_r = simulate["all_r"]
-    np.random.seed(simulate["rng_seed"])
+    # one seed sequence per number of factors
+    seeds = np.random.SeedSequence(simulate["rng_seed"]).spawn(len(all_r))
     # Run the monte carlo simulation
     df_sim_range_r = pd.DataFrame()
     df_statistic_range_r = pd.DataFrame()
-    for r in all_r:
+    for r, seed in zip(all_r, seeds):
         df_sim_result = simulation_coefficient(
             dgp_func=dgp_func,
             all_N=simulate["all_N"],
@@ -54,6 +55,7 @@ def task_simulation_and_statistics_range_r(depends_on, produces):
             r=r,
             interactive_start_value_effect=simulate["interactive_start_value_effect"],
             within_effect=simulate["within_effect"],
+            seed=seed,
             **simulate["beta_true"],
         )
         df_statistic = statistics_coefficient(
@@ -95,7 +97,7 @@ def task_factor_estimate_random_iid_residual(produces):
     all_N = [100, 100, 200, 500, 1000]
     all_T = [40, 60, 60, 60, 60]
     df_factor_estimate = pd.DataFrame()
-    np.random.seed(123)
+    rng = np.random.default_rng(123)
     for case in range(len(all_N)):
         N = all_N[case]
         T = all_T[case]
@@ -106,7 +108,7 @@ def task_factor_estimate_random_iid_residual(produces):
         df_sim["T"] = [T] * nsims
         df_sim["N"] = [N] * nsims
         for i in range(nsims):
-            residual = dgp_random_iid_residual(N, T, r)
+            residual = dgp_random_iid_residual(N, T, r, rng)
             factor_estimator = FactorEstimator(residual)
             df_sim.loc[i, "PC1"] = factor_estimator.r_hat(rmax, "PC", 1)
             df_sim.loc[i, "PC2"] = factor_estimator.r_hat(rmax, "PC", 2)
@@ -136,7 +138,7 @@ def task_factor_estimate_interactive_fixed_effects_model(produces):
     beta_true = {"beta1": 1, "beta2": 3, "mu": 5, "gamma": 2, "delta": 4}
     r0 = 8
     df_factor_estimate = pd.DataFrame()
-    np.random.seed(123)
+    rng = np.random.default_rng(123)
     for case in range(len(all_N)):
         N = all_N[case]
         T = all_T[case]
@@ -147,7 +149,7 @@ def task_factor_estimate_interactive_fixed_effects_model(produces):
         df_sim["T"] = [T] * nsims
         df_sim["N"] = [N] * nsims
         for i in range(nsims):
-            X, Y, panel_df = dgp_func(T, N, **beta_true)
+            X, Y, panel_df = dgp_func(T, N, rng=rng, **beta_true)
             start_value_estimator = PooledOLS(
                 panel_df.y, panel_df[["x" + str(i) for i in range(1, 6)]]
             )
@@ -155,7 +157,7 @@ def task_factor_estimate_interactive_fixed_effects_model(produces):
             interactive_start_value = start_value_result.params.tolist()
             interactive_estimator = InteractiveFixedEffect(Y, X)
             beta_hat, beta_hat_list, f_hat, lambda_hat = interactive_estimator.fit(
-                r0, interactive_start_value, tolerance
+                r0, interactive_start_value, tolerance, history="off"
             )
             residual = Y - (X.T.dot(beta_hat)).T
             factor_estimator = FactorEstimator(residual)
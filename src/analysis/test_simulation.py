@@ -1,11 +1,20 @@
+import pickle
+
 import numpy as np
+import pandas as pd
 
 from src.analysis.monte_carlo_dgp import dgp_additive_fixed_effects_model
+from src.analysis.monte_carlo_dgp import dgp_additive_fixed_effects_model_no_iid
 from src.analysis.monte_carlo_dgp import dgp_interactive_fixed_effects_model
 from src.analysis.monte_carlo_dgp import (
     dgp_interactive_fixed_effects_model_with_common_and_time_invariant,
 )
+from src.analysis.monte_carlo_dgp import (
+    dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid,
+)
+from src.analysis.monte_carlo_dgp import dgp_random_iid_residual
 from src.analysis.monte_carlo_dgp import dgp_time_invariant_fixed_effects_model
+from src.analysis.monte_carlo_dgp import generate_arma_sample
 from src.analysis.simulation import simulation_coefficient
 from src.analysis.simulation import statistics_coefficient
 
@@ -21,6 +30,7 @@ def test_simulation_coefficient_model1():
         all_T,
         nsims,
         need_sde=True,
+        seed=0,
         interactive_start_value_effect="pooling",
         within_effect="individual",
         beta1=1,
@@ -29,8 +39,9 @@ def test_simulation_coefficient_model1():
         gamma=2,
         delta=4,
     )
-    assert df_sim_result.shape == (4, 11)
+    assert df_sim_result.shape == (4, 12)
     assert not df_sim_result.isna().any(axis=None, skipna=False)
+    assert df_sim_result["converged_interactive"].all()
 
 
 def test_simulation_coefficient_model2():
@@ -44,6 +55,7 @@ def test_simulation_coefficient_model2():
         all_T,
         nsims,
         need_sde=True,
+        seed=0,
         interactive_start_value_effect="twoways",
         within_effect="twoways",
         beta1=1,
@@ -52,8 +64,9 @@ def test_simulation_coefficient_model2():
         gamma=2,
         delta=4,
     )
-    assert df_sim_result.shape == (4, 11)
+    assert df_sim_result.shape == (4, 12)
     assert not df_sim_result.isna().any(axis=None, skipna=False)
+    assert df_sim_result["converged_interactive"].all()
 
 
 def test_simulation_coefficient_model3():
@@ -67,6 +80,7 @@ def test_simulation_coefficient_model3():
         all_T,
         nsims,
         need_sde=True,
+        seed=0,
         interactive_start_value_effect="pooling",
         within_effect="twoways",
         beta1=1,
@@ -75,8 +89,9 @@ def test_simulation_coefficient_model3():
         gamma=2,
         delta=4,
     )
-    assert df_sim_result.shape == (4, 15)
+    assert df_sim_result.shape == (4, 16)
     assert not df_sim_result.isna().any(axis=None, skipna=False)
+    assert df_sim_result["converged_interactive"].all()
 
 
 def test_simulation_coefficient_model4():
@@ -90,6 +105,7 @@ def test_simulation_coefficient_model4():
         all_T,
         nsims,
         need_sde=True,
+        seed=0,
         interactive_start_value_effect="pooling",
         within_effect="twoways",
         beta1=1,
@@ -98,8 +114,8 @@ def test_simulation_coefficient_model4():
         gamma=2,
         delta=4,
     )
-    assert df_sim_result.shape == (4, 23)
-    na_expect = np.full(23, False)
+    assert df_sim_result.shape == (4, 24)
+    na_expect = np.full(24, False)
     na_expect[[11, 12, 21, 22]] = True
     np.testing.assert_array_equal(
         df_sim_result.isna().any(axis=0, skipna=False), na_expect
@@ -117,6 +133,7 @@ def test_statistics_coefficient():
         all_T,
         nsims,
         need_sde=True,
+        seed=0,
         interactive_start_value_effect="pooling",
         within_effect="twoways",
         beta1=1,
@@ -128,8 +145,8 @@ def test_statistics_coefficient():
     df_statistic = statistics_coefficient(
         all_N, all_T, nsims, df_sim_result, beta1=1, beta2=3, mu=5, gamma=2, delta=4
     )
-    assert df_statistic.shape == (2, 62)
-    na_expect = np.full(62, False)
+    assert df_statistic.shape == (2, 63)
+    na_expect = np.full(63, False)
     na_expect[[35, 36, 40, 41, 45, 46, 50, 51, 55, 56, 60, 61]] = True
     np.testing.assert_array_equal(
         df_statistic.isna().any(axis=0, skipna=False), na_expect
@@ -160,9 +177,151 @@ def test_statistics_coefficient():
         df_statistic.loc[1, "mean_within.1"]
         + df_statistic.loc[1, "sde_within.1"] * 1.959963984540054,
     )
+    assert (df_statistic["nonconverged_interactive"] == 0).all()
     np.testing.assert_almost_equal(
         df_statistic.loc[0, "rmse_interactive.2"],
         np.sqrt(
             ((df_sim_result.loc[0:1, "beta_interactive.2"] - 3) ** 2).mean(axis=None)
         ),
     )
+
+
+def test_simulation_coefficient_not_converged():
+    dgp_fun = dgp_interactive_fixed_effects_model
+    all_N = [10]
+    all_T = [9]
+    nsims = 2
+    df_sim_result = simulation_coefficient(
+        dgp_fun,
+        all_N,
+        all_T,
+        nsims,
+        tolerance=1e-12,
+        interactive_start_value_effect="pooling",
+        within_effect="twoways",
+        max_iter=1,
+        beta1=1,
+        beta2=3,
+        mu=5,
+    )
+    assert not df_sim_result["converged_interactive"].any()
+    df_statistic = statistics_coefficient(
+        all_N, all_T, nsims, df_sim_result, beta1=1, beta2=3, mu=5
+    )
+    assert df_statistic.loc[0, "nonconverged_interactive"] == 2
+
+
+def test_dgp_rng():
+    for dgp_fun in [
+        dgp_interactive_fixed_effects_model,
+        dgp_additive_fixed_effects_model_no_iid,
+    ]:
+        X, Y, _ = dgp_fun(9, 10, beta1=1, beta2=3, mu=5, rng=1)
+        X_same, Y_same, _ = dgp_fun(
+            9, 10, beta1=1, beta2=3, mu=5, rng=np.random.default_rng(1)
+        )
+        X_other, _, _ = dgp_fun(9, 10, beta1=1, beta2=3, mu=5, rng=2)
+        np.testing.assert_array_equal(X, X_same)
+        np.testing.assert_array_equal(Y, Y_same)
+        assert not np.allclose(X, X_other)
+
+
+def test_simulation_coefficient_seed():
+    kwargs = {
+        "dgp_func": dgp_interactive_fixed_effects_model,
+        "all_N": [10, 20],
+        "all_T": [9, 19],
+        "nsims": 2,
+        "beta1": 1,
+        "beta2": 3,
+        "mu": 5,
+    }
+    df_sim_result = simulation_coefficient(**kwargs, processes=1, seed=7)
+    # independent of the number of processes
+    df_parallel = simulation_coefficient(**kwargs, processes=2, seed=7)
+    pd.testing.assert_frame_equal(df_sim_result, df_parallel)
+    # the cases of a grid are independent of the other cases
+    df_part = simulation_coefficient(
+        **{**kwargs, "all_N": [10], "all_T": [9]}, processes=1, seed=7
+    )
+    pd.testing.assert_frame_equal(df_sim_result.iloc[0:2], df_part)
+    df_other = simulation_coefficient(**kwargs, processes=1, seed=8)
+    assert not np.allclose(
+        df_sim_result["beta_interactive.1"], df_other["beta_interactive.1"]
+    )
+
+
+def test_dgp_batch():
+    for dgp_fun in [
+        dgp_interactive_fixed_effects_model_with_common_and_time_invariant,
+        dgp_interactive_fixed_effects_model_with_common_and_time_invariant_no_iid,
+    ]:
+        X, Y = dgp_fun(9, 10, beta1=1, beta2=3, mu=5, gamma=2, delta=4, nsims=4, rng=1)
+        assert X.shape == (4, 5, 9, 10)
+        assert Y.shape == (4, 9, 10)
+        # constant, time-invariant and entity-invariant regressors
+        np.testing.assert_array_equal(X[:, 2], 1)
+        assert (X[:, 3] == X[:, 3, 0:1]).all()
+        assert (X[:, 4] == X[:, 4, :, 0:1]).all()
+        assert not np.allclose(X[0], X[1])
+        # a batch of one is the single panel of the same stream
+        X_one, Y_one = dgp_fun(
+            9, 10, beta1=1, beta2=3, mu=5, gamma=2, delta=4, nsims=1, rng=1
+        )
+        X_single, Y_single, _ = dgp_fun(
+            9, 10, beta1=1, beta2=3, mu=5, gamma=2, delta=4, rng=1
+        )
+        np.testing.assert_array_equal(X_one[0], X_single)
+        np.testing.assert_array_equal(Y_one[0], Y_single)
+    residual = dgp_random_iid_residual(10, 9, 3, rng=1, nsims=4)
+    assert residual.shape == (4, 10, 9)
+
+
+def test_dgp_lazy_panel_df():
+    X, Y, panel_df = dgp_interactive_fixed_effects_model(
+        9, 10, beta1=1, beta2=3, mu=5, rng=1
+    )
+    assert panel_df._frame is None
+    assert len(panel_df) == 90
+    assert panel_df.index.names == ["nr", "year"]
+    assert list(panel_df.columns) == ["y", "x1", "x2", "x3"]
+    np.testing.assert_array_equal(panel_df.loc[(3, 2)], [Y[2, 3], *X[:, 2, 3]])
+    np.testing.assert_array_equal(panel_df.y.values, Y.T.ravel())
+    np.testing.assert_array_equal(panel_df[["x2"]].values.ravel(), X[1].T.ravel())
+    assert panel_df._frame is not None
+    unpickled = pickle.loads(pickle.dumps(panel_df))
+    assert unpickled._frame is None
+    pd.testing.assert_frame_equal(unpickled.frame, panel_df.frame)
+
+
+def test_dgp_compact():
+    dgp_fun = dgp_interactive_fixed_effects_model_with_common_and_time_invariant
+    X, Y, panel_df = dgp_fun(
+        9, 10, beta1=1, beta2=3, mu=5, gamma=2, delta=4, rng=1, compact=True
+    )
+    X_dense, Y_dense, _ = dgp_fun(
+        9, 10, beta1=1, beta2=3, mu=5, gamma=2, delta=4, rng=1
+    )
+    assert X.kinds == ("full", "full", "constant", "entity", "time")
+    np.testing.assert_array_equal(np.asarray(X), X_dense)
+    np.testing.assert_array_equal(Y, Y_dense)
+    np.testing.assert_array_equal(panel_df["x4"].values, X_dense[3].T.ravel())
+    X, _, _ = dgp_interactive_fixed_effects_model(
+        9, 10, beta1=1, beta2=3, mu=5, rng=1, compact=True
+    )
+    assert X.kinds == ("full", "full", "constant")
+
+
+def test_generate_arma_sample():
+    x = generate_arma_sample([1, 0.7], [1, 0.3], (3, 40, 2), rng=1, axis=1)
+    assert x.shape == (3, 40, 2)
+    # x_t = -0.7 x_{t-1} + e_t + 0.3 e_{t-1}, starting from zero
+    e = np.random.default_rng(1).standard_normal(size=(3, 40, 2))
+    np.testing.assert_allclose(x[:, 0], e[:, 0])
+    np.testing.assert_allclose(
+        x[:, 1:], -0.7 * x[:, :-1] + e[:, 1:] + 0.3 * e[:, :-1], atol=1e-12
+    )
+    # burn-in drops the start of longer series
+    x_burnin = generate_arma_sample([1, 0.7], [1], (40, 2), rng=1, burnin=10)
+    x_long = generate_arma_sample([1, 0.7], [1], (50, 2), rng=1)
+    np.testing.assert_array_equal(x_burnin, x_long[10:])
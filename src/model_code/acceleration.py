@@ -0,0 +1,126 @@
+"""
+Acceleration schemes for the fixed-point iteration on beta_hat used by
+`InteractiveFixedEffect.fit`. Each scheme receives the current point beta_hat, the
+plain step G(beta_hat), the objective at beta_hat and optionally the objective of the
+plain step at the factors and loadings of beta_hat, an upper bound of the objective at
+G(beta_hat), and proposes the next point. The plain alternating step never increases
+the objective, so an extrapolated point is rejected in favour of the plain step
+whenever its objective is worse.
+"""
+import numpy as np
+
+ACCELERATIONS = (None, "anderson", "squarem")
+
+
+def make_accelerator(acceleration, **kw):
+    """
+    Create the accelerator of an acceleration scheme.
+
+    Parameters
+    ----------
+    acceleration : string or None
+        One of None (plain iteration), "anderson", "squarem".
+    kw : dict
+        Options passed to the accelerator, e.g. memory of "anderson".
+    """
+    if acceleration not in ACCELERATIONS:
+        raise ValueError(f"acceleration should be one of {ACCELERATIONS}")
+    return {None: PlainIteration, "anderson": Anderson, "squarem": Squarem}[
+        acceleration
+    ](**kw)
+
+
+class PlainIteration:
+    """
+    Plain fixed-point iteration x_{k+1} = G(x_k).
+    """
+
+    def __init__(self):
+        self.n_rejected = 0
+
+    def step(self, x, gx, objective, objective_gx=None):
+        return gx
+
+
+class Anderson:
+    """
+    Anderson mixing (type II) with finite memory (Walker and Ni, 2011).
+
+    Parameters
+    ----------
+    memory : int, optional
+        Number of previous steps used for the extrapolation.
+
+    An extrapolated point is rejected if its objective is worse than the one of the
+    plain step it replaces, i.e. objective_gx of the last point, or its objective if
+    objective_gx is not given.
+    """
+
+    def __init__(self, memory=5):
+        self.memory = memory
+        self.n_rejected = 0
+        self._reset()
+
+    def _reset(self):
+        self._residuals = []
+        self._gxs = []
+        self._last = None
+        self._extrapolated = False
+
+    def step(self, x, gx, objective, objective_gx=None):
+        if self._extrapolated and objective > self._last[1]:
+            # extrapolation is worse than the plain step of the last point, take it
+            self.n_rejected += 1
+            last_gx = self._last[0]
+            self._reset()
+            return last_gx
+        self._residuals.append(np.ravel(gx - x))
+        self._gxs.append(np.ravel(gx))
+        self._residuals = self._residuals[-(self.memory + 1) :]
+        self._gxs = self._gxs[-(self.memory + 1) :]
+        self._last = (gx, objective if objective_gx is None else objective_gx)
+        if len(self._residuals) < 2:
+            self._extrapolated = False
+            return gx
+        residuals = np.array(self._residuals).T
+        gxs = np.array(self._gxs).T
+        d_residuals = np.diff(residuals, axis=1)
+        d_gxs = np.diff(gxs, axis=1)
+        gamma = np.linalg.lstsq(d_residuals, residuals[:, -1], rcond=None)[0]
+        self._extrapolated = True
+        return (gxs[:, -1] - d_gxs.dot(gamma)).reshape(np.shape(gx))
+
+
+class Squarem:
+    r"""
+    Squared extrapolation SQUAREM, scheme S3 (Varadhan and Roland, 2008).
+
+    One cycle takes two plain steps x1 = G(x0), x2 = G(x1), extrapolates to
+    :math:`x' = x_0 - 2\alpha r + \alpha^2 v` with :math:`r = x_1 - x_0`,
+    :math:`v = x_2 - 2x_1 + x_0`, :math:`\alpha = -\|r\| / \|v\|`, and stabilizes
+    with G(x').
+    """
+
+    def __init__(self):
+        self.n_rejected = 0
+        self._stage = 0
+
+    def step(self, x, gx, objective, objective_gx=None):
+        if self._stage == 0:
+            self._x0, self._g0, self._objective0 = x, gx, objective
+            self._stage = 1
+            return gx
+        if self._stage == 1:
+            self._g1 = gx
+            r = self._g0 - self._x0
+            v = gx - self._g0 - r
+            norm_v = np.linalg.norm(v)
+            alpha = -np.linalg.norm(r) / norm_v if norm_v > 0 else -1
+            alpha = min(alpha, -1)
+            self._stage = 2
+            return self._x0 - 2 * alpha * r + alpha ** 2 * v
+        self._stage = 0
+        if not np.isfinite(objective) or objective > self._objective0:
+            self.n_rejected += 1
+            return self._g1
+        return gx
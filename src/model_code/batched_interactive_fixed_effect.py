@@ -0,0 +1,146 @@
+"""
+Calculate the interactive fixed effect estimator of Bai(2009) for a stack of panels
+with the same shape, e.g. all replicates of one (N, T) cell of a Monte Carlo
+simulation. The alternating iterations run for all panels together with batched
+`eigh` and `solve`, and panels that have converged drop out of the computation.
+The simulation tasks fit every panel with `InteractiveFixedEffect`, which also gives
+the standard errors and the within estimator per panel, so this estimator is only
+used directly.
+"""
+import time
+
+import numpy as np
+
+from src.model_code.interactive_fixed_effect import Convergence
+
+
+class BatchedInteractiveFixedEffect:
+    r"""
+    Interactive fixed effects estimator for a stack of panels
+
+    Parameters
+    ----------
+    dependent : array-like
+        Dependent (left-hand-side) variable (panel by time by entity).
+    exog : array-like
+        Exogenous or right-hand-side variables (panel by variable by time by entity).
+
+    Notes
+    -----
+    .. math::
+        y_{b,it} = \beta_b x_{b,it} + \lambda_{b,i}'F_{b,t} + \epsilon_{b,it}
+    """
+
+    def __init__(self, dependent, exog):
+        self._dependent = dependent
+        self._exog = exog
+        self.B = exog.shape[0]
+        self.p = exog.shape[1]
+        self.T = exog.shape[2]
+        self.N = exog.shape[3]
+        # iteration-invariant cross products of every panel
+        self._A = np.einsum("bptn,bqtn->bpq", exog, exog)
+        self._xy = np.einsum("bptn,btn->bp", exog, dependent)
+        self.convergence = None
+
+    def fit(self, r, beta_hat_0=None, tolerance=0.0001, max_iter=10000):
+        """
+        Estimate parameters of all panels
+
+        Parameters
+        ----------
+        r : int
+            Number of factors.
+        beta_hat_0: array-like, optional
+            Starting values of estimator, shape (panel by variable). A vector of length
+            p is used for every panel.
+        tolerance : float, optional
+            Iteration precision.
+        max_iter : int, optional
+            Maximum number of iterations.
+
+        The record `convergence` is stored with the fields of
+        `src.model_code.interactive_fixed_effect.Convergence`, each one an array over
+        the panels except elapsed.
+
+        Returns
+        -------
+        beta_hat : array-like
+            Estimate the result of slope coefficients (panel by variable).
+        f_hat : array-like
+            Estimate the result of time fixed effects (panel by time by factor).
+        lambda_hat : array-like
+            Estimate the result of individual fixed effects (panel by entity by
+            factor).
+        """
+        if beta_hat_0 is None:
+            beta_hat = np.zeros(shape=(self.B, self.p))
+        else:
+            beta_hat = np.broadcast_to(
+                np.array(beta_hat_0, dtype=float), (self.B, self.p)
+            ).copy()
+        f_hat = np.full(shape=(self.B, self.T, r), fill_value=np.nan)
+        lambda_hat = np.full(shape=(self.B, self.N, r), fill_value=np.nan)
+        n_iter = np.zeros(self.B, dtype=int)
+        step_norm = np.full(self.B, np.inf)
+        ssr = np.full(self.B, np.nan)
+        active = np.ones(self.B, dtype=bool)
+        start_time = time.perf_counter()
+        while active.any():
+            # only slice when some panels have converged, otherwise work on views
+            idx = slice(None) if active.all() else np.flatnonzero(active)
+            f, lam, beta_new, ssr[idx] = self._iterate(beta_hat[idx], idx, r)
+            f_hat[idx] = f
+            lambda_hat[idx] = lam
+            step_norm[idx] = np.linalg.norm(beta_new - beta_hat[idx], axis=1)
+            beta_hat[idx] = beta_new
+            n_iter[idx] += 1
+            active &= (step_norm > tolerance) & (n_iter < max_iter)
+        self.convergence = Convergence(
+            converged=step_norm <= tolerance,
+            n_iter=n_iter,
+            step_norm=step_norm,
+            objective=ssr,
+            elapsed=time.perf_counter() - start_time,
+            n_rejected=np.zeros(self.B, dtype=int),
+        )
+        return beta_hat, f_hat, lambda_hat
+
+    def _iterate(self, beta_hat, idx, r):
+        """
+        One alternating step for the panels selected by idx
+        """
+        X = self._exog[idx]
+        w = self._dependent[idx] - np.einsum("bp,bptn->btn", beta_hat, X)
+        f_hat = np.sqrt(self.T) * self._top_left_singular_vectors(w, r)
+        lambda_hat = np.matmul(w.transpose(0, 2, 1), f_hat) / self.T
+        B = self._xy[idx] - np.einsum(
+            "bptn,btn->bp", X, np.matmul(f_hat, lambda_hat.transpose(0, 2, 1))
+        )
+        beta_hat_new = np.linalg.solve(self._A[idx], B[..., np.newaxis])[..., 0]
+        ssr = np.einsum("btn,btn->b", w, w) - self.T * np.einsum(
+            "bnr,bnr->b", lambda_hat, lambda_hat
+        )
+        return f_hat, lambda_hat, beta_hat_new, ssr
+
+    def _top_left_singular_vectors(self, w, r):
+        """
+        Left singular vectors of the r largest singular values of every panel of w,
+        from the smaller of W * W' and W' * W.
+        """
+        if self.T <= self.N:
+            _, v = np.linalg.eigh(np.matmul(w, w.transpose(0, 2, 1)))
+            return v[:, :, ::-1][:, :, 0:r]
+        eigenvalue, v = np.linalg.eigh(np.matmul(w.transpose(0, 2, 1), w))
+        eigenvalue = eigenvalue[:, ::-1][:, 0:r]
+        v = v[:, :, ::-1][:, :, 0:r]
+        # eigenvalues below this are numerically zero, see top_left_singular_vectors
+        tolerance = eigenvalue[:, 0:1] * np.finfo(w.dtype).eps * max(self.T, self.N)
+        deficient = (eigenvalue <= tolerance).any(axis=1)
+        s = np.sqrt(np.where(eigenvalue > tolerance, eigenvalue, 1))
+        u = np.matmul(w, v) / s[:, np.newaxis, :]
+        # (nearly) rank deficient panels can not be mapped back, use W * W' for them
+        for b in np.flatnonzero(deficient):
+            _, v_b = np.linalg.eigh(w[b].dot(w[b].T))
+            u[b] = v_b[:, ::-1][:, 0:r]
+        return u
@@ -0,0 +1,222 @@
+"""
+Bootstrap inference for the interactive fixed effect estimator. The replicates run in
+worker processes which read the base panel from shared memory instead of receiving a
+pickled copy with every task, so the work per replicate is only the resampling and the
+fit, and the runner scales with the number of processes.
+"""
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+from src.model_code.parallel import make_pool
+from src.model_code.parallel import resolve_thread_split
+
+BOOTSTRAP_METHODS = ("entity", "wild")
+
+BootstrapResult = namedtuple(
+    "BootstrapResult",
+    ["beta_hat", "replicates", "se", "cov", "ci_lower", "ci_upper", "n_converged"],
+)
+
+# base panel and full-sample fit of a worker process, set by _init_worker
+_worker = {}
+
+
+def bootstrap(
+    dependent,
+    exog,
+    r,
+    n_replicates=199,
+    method="entity",
+    beta_hat=None,
+    tolerance=0.0001,
+    max_iter=10000,
+    acceleration=None,
+    alpha=0.05,
+    seed=0,
+    processes=None,
+    blas_threads=None,
+):
+    """
+    Bootstrap the slope coefficients of the interactive fixed effect estimator.
+
+    Parameters
+    ----------
+    dependent : array-like
+        Dependent variable (time by entity).
+    exog : array-like
+        Exogenous variables (variable by time by entity).
+    r : int
+        Number of factors.
+    n_replicates : int, optional
+        Number of bootstrap replicates.
+    method : string, optional
+        One of "entity", "wild". "entity" resamples entities with replacement, i.e.
+        whole time series as blocks. "wild" keeps the regressors and the fitted
+        interactive effects and multiplies the residual series of every entity by a
+        Rademacher weight, which keeps the serial correlation within entities.
+    beta_hat : array-like, optional
+        Full-sample estimate. Estimated if not given. The factors and loadings are
+        estimated at beta_hat.
+    tolerance : float, optional
+        Iteration precision of every fit.
+    max_iter : int, optional
+        Maximum number of iterations of every fit.
+    acceleration : string, optional
+        Acceleration of every fit, see `InteractiveFixedEffect.fit`.
+    alpha : float, optional
+        The percentile confidence intervals have level 1 - alpha.
+    seed : int, optional
+        Seed of the resampling. Replicate b uses the seed sequence (seed, b), so the
+        result does not depend on the number of processes.
+    processes : int, optional
+        Number of worker processes. With 1 the replicates run in the calling process.
+    blas_threads : int, optional
+        Number of BLAS/LAPACK threads of every worker process. By default the cores
+        are split by `src.model_code.parallel.resolve_thread_split`.
+
+    Every replicate starts from the full-sample beta_hat.
+
+    Returns
+    -------
+    result : BootstrapResult
+        Fields beta_hat (full-sample estimate), replicates (replicate by variable),
+        se (bootstrap standard errors), cov (covariance matrix of the replicates),
+        ci_lower, ci_upper (percentile confidence intervals) and n_converged (number
+        of replicates whose fit converged).
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"method should be one of {BOOTSTRAP_METHODS}")
+    dependent = np.asarray(dependent, dtype=float)
+    exog = np.asarray(exog, dtype=float)
+    estimator = InteractiveFixedEffect(dependent, exog)
+    if beta_hat is None:
+        beta_hat, _, f_hat, lambda_hat = estimator.fit(
+            r, None, tolerance, acceleration, max_iter, history="off"
+        )
+    else:
+        beta_hat = np.ravel(beta_hat)
+        # the factors and loadings of the first iteration are the ones at its start
+        _, _, f_hat, lambda_hat = estimator.fit(r, beta_hat, max_iter=1, history="off")
+    fit_options = {
+        "r": r,
+        "method": method,
+        "beta_hat": beta_hat,
+        "f_hat": f_hat,
+        "lambda_hat": lambda_hat,
+        "tolerance": tolerance,
+        "max_iter": max_iter,
+        "acceleration": acceleration,
+        "seed": seed,
+    }
+    replicates = np.full((n_replicates, exog.shape[0]), np.nan)
+    converged = np.zeros(n_replicates, dtype=bool)
+    processes, blas_threads = resolve_thread_split(
+        processes, blas_threads, [exog.shape[2]], [exog.shape[1]], n_replicates
+    )
+    if processes == 1:
+        _init_worker(None, dependent, exog, fit_options)
+        for b in range(n_replicates):
+            _, replicates[b], converged[b] = _replicate(b)
+        _worker.clear()
+    else:
+        blocks = []
+        try:
+            for array in (dependent, exog):
+                blocks.append(_to_shared_memory(array))
+            specs = [(blocks[0].name, dependent.shape), (blocks[1].name, exog.shape)]
+            with make_pool(
+                processes, blas_threads, _init_worker, (specs, None, None, fit_options)
+            ) as pool:
+                chunksize = max(1, n_replicates // (4 * processes))
+                # collect the replicates in the order they finish
+                for b, beta, conv in pool.imap_unordered(
+                    _replicate, range(n_replicates), chunksize
+                ):
+                    replicates[b] = beta
+                    converged[b] = conv
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    return _summarize(beta_hat, replicates, converged, alpha)
+
+
+def _summarize(beta_hat, replicates, converged, alpha):
+    """
+    Standard errors and percentile confidence intervals of the replicates.
+    """
+    cov = np.atleast_2d(np.cov(replicates, rowvar=False))
+    ci_lower, ci_upper = np.percentile(
+        replicates, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0
+    )
+    return BootstrapResult(
+        beta_hat=beta_hat,
+        replicates=replicates,
+        se=np.sqrt(np.diag(cov)),
+        cov=cov,
+        ci_lower=ci_lower,
+        ci_upper=ci_upper,
+        n_converged=int(converged.sum()),
+    )
+
+
+def _to_shared_memory(array):
+    """
+    Copy an array into a new shared memory block.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=float, buffer=block.buf)[...] = array
+    return block
+
+
+def _init_worker(specs, dependent, exog, fit_options):
+    """
+    Attach a worker to the shared base panel, or use the given arrays if specs is
+    None, and precompute the fitted values and residuals of the full sample.
+    """
+    if specs is not None:
+        blocks = [shared_memory.SharedMemory(name=name) for name, _ in specs]
+        dependent, exog = (
+            np.ndarray(shape, dtype=float, buffer=block.buf)
+            for block, (_, shape) in zip(blocks, specs)
+        )
+        # keep the blocks alive as long as the views are used
+        _worker["blocks"] = blocks
+    _worker["dependent"] = dependent
+    _worker["exog"] = exog
+    _worker.update(fit_options)
+    if fit_options["method"] == "wild":
+        fitted = np.tensordot(fit_options["beta_hat"], exog, axes=1) + fit_options[
+            "f_hat"
+        ].dot(fit_options["lambda_hat"].T)
+        _worker["fitted"] = fitted
+        _worker["residual"] = dependent - fitted
+
+
+def _replicate(b):
+    """
+    Fit replicate b. Returns b, its beta_hat and whether the fit converged.
+    """
+    rng = np.random.default_rng([_worker["seed"], b])
+    exog = _worker["exog"]
+    N = exog.shape[2]
+    if _worker["method"] == "entity":
+        entities = rng.integers(0, N, size=N)
+        dependent = _worker["dependent"][:, entities]
+        exog = exog[:, :, entities]
+    else:
+        weights = rng.choice([-1.0, 1.0], size=N)
+        dependent = _worker["fitted"] + _worker["residual"] * weights
+    estimator = InteractiveFixedEffect(dependent, exog)
+    beta_hat = estimator.fit(
+        _worker["r"],
+        _worker["beta_hat"],
+        _worker["tolerance"],
+        _worker["acceleration"],
+        _worker["max_iter"],
+        history="off",
+    )[0]
+    return b, beta_hat, estimator.convergence.converged
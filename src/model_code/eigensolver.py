@@ -0,0 +1,153 @@
+"""
+Extract the eigenvectors belonging to the r largest eigenvalues of a symmetric positive
+semi-definite matrix. Both estimators only need these r leading eigenvectors to get the
+factors, so a full diagonalization is not necessary for long panels. The factors can
+also be obtained from the smaller side of the residual matrix or from its thin SVD.
+"""
+import numpy as np
+from scipy.sparse.linalg import eigsh
+
+EIGENSOLVERS = ("auto", "eigh", "arpack", "randomized")
+FACTOR_SIDES = ("auto", "T", "N", "svd")
+
+
+def choose_eigensolver(n, r):
+    """
+    Choose an eigensolver from the size of the matrix and the number of eigenvectors.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows (and columns) of the matrix.
+    r : int
+        Number of leading eigenvectors needed.
+
+    Returns
+    -------
+    solver : string
+        "eigh" for small matrices or when many eigenvectors are needed, "arpack" for
+        long panels with a few factors and "randomized" for very long panels.
+    """
+    if n <= 500 or 10 * r >= n:
+        return "eigh"
+    if n <= 5000:
+        return "arpack"
+    return "randomized"
+
+
+def top_eigenvectors(matrix, r, solver="auto", n_oversamples=10, n_power_iter=4):
+    """
+    Eigenvectors of the r largest eigenvalues of a symmetric matrix, largest first.
+
+    Parameters
+    ----------
+    matrix : array-like
+        Symmetric positive semi-definite matrix. Shape is (n, n).
+    r : int
+        Number of leading eigenvectors.
+    solver : string, optional
+        One of "auto", "eigh", "arpack", "randomized". "eigh" diagonalizes the full
+        matrix, "arpack" runs the Lanczos method of ARPACK for the top r eigenpairs and
+        "randomized" uses a randomized range finder with power iterations. "auto"
+        chooses by `choose_eigensolver`.
+    n_oversamples : int, optional
+        Additional random directions used by the randomized range finder.
+    n_power_iter : int, optional
+        Number of power iterations used by the randomized range finder.
+
+    Returns
+    -------
+    eigenvalue : array-like
+        The r largest eigenvalues in descending order.
+    v : array-like
+        Corresponding eigenvectors in columns. Shape is (n, r).
+    solver : string
+        The eigensolver actually used.
+    """
+    if solver not in EIGENSOLVERS:
+        raise ValueError(f"solver should be one of {EIGENSOLVERS}")
+    n = matrix.shape[0]
+    if solver == "auto":
+        solver = choose_eigensolver(n, r)
+    if solver != "eigh" and r >= n - 1:
+        # ARPACK needs r < n - 1 and a full range finder is no cheaper than eigh
+        solver = "eigh"
+    if solver == "eigh":
+        eigenvalue, v = np.linalg.eigh(matrix)
+    elif solver == "arpack":
+        eigenvalue, v = eigsh(matrix, k=r, which="LA")
+    else:
+        eigenvalue, v = _randomized_eigh(matrix, r, n_oversamples, n_power_iter)
+    order = np.argsort(-eigenvalue)[0:r]
+    return eigenvalue[order], v[:, order], solver
+
+
+def choose_factor_side(T, N):
+    """
+    Choose the cheaper side of a (T, N) matrix W to diagonalize: W * W' is (T, T) and
+    W' * W is (N, N).
+    """
+    return "T" if T <= N else "N"
+
+
+def top_left_singular_vectors(w, r, side="auto", solver="auto"):
+    r"""
+    Left singular vectors of the r largest singular values of w, largest first. They
+    are the r leading eigenvectors of w * w'.
+
+    Parameters
+    ----------
+    w : array-like
+        Matrix to decompose. Shape is (T, N).
+    r : int
+        Number of leading singular vectors.
+    side : string, optional
+        One of "auto", "T", "N", "svd". "T" diagonalizes the (T, T) matrix w * w', "N"
+        diagonalizes the (N, N) matrix w' * w and maps its eigenvectors back by
+        :math:`u_k = w v_k / \sqrt{s_k}`, "svd" runs a thin SVD of w. "auto" chooses
+        by `choose_factor_side`. "N" falls back to "T" if w is numerically rank
+        deficient, i.e. some :math:`s_k` is below :math:`s_1` times the machine
+        epsilon times max(T, N).
+    solver : string, optional
+        Eigensolver for the sides "T" and "N". See `top_eigenvectors`.
+
+    Returns
+    -------
+    u : array-like
+        Orthonormal left singular vectors in columns. Shape is (T, r).
+    side : string
+        The side actually used.
+    solver : string
+        The eigensolver actually used, "svd" for the thin SVD.
+    """
+    if side not in FACTOR_SIDES:
+        raise ValueError(f"side should be one of {FACTOR_SIDES}")
+    if side == "auto":
+        side = choose_factor_side(*w.shape)
+    if side == "svd":
+        u, _, _ = np.linalg.svd(w, full_matrices=False)
+        return u[:, 0:r], side, "svd"
+    if side == "N":
+        eigenvalue, v, solver_used = top_eigenvectors(w.T.dot(w), r, solver)
+        tolerance = eigenvalue.max() * np.finfo(w.dtype).eps * max(w.shape)
+        if eigenvalue.min() > tolerance:
+            return w.dot(v) / np.sqrt(eigenvalue), side, solver_used
+        # (nearly) rank deficient, the null directions can not be mapped back
+        side = "T"
+    _, u, solver_used = top_eigenvectors(w.dot(w.T), r, solver)
+    return u, side, solver_used
+
+
+def _randomized_eigh(matrix, r, n_oversamples, n_power_iter):
+    """
+    Randomized range finder (Halko, Martinsson and Tropp, 2011) for symmetric matrix.
+    """
+    n = matrix.shape[0]
+    k = min(n, r + n_oversamples)
+    rng = np.random.default_rng(0)
+    omega = rng.standard_normal(size=(n, k)).astype(matrix.dtype, copy=False)
+    q, _ = np.linalg.qr(matrix.dot(omega))
+    for _ in range(n_power_iter):
+        q, _ = np.linalg.qr(matrix.dot(q))
+    eigenvalue, u = np.linalg.eigh(q.T.dot(matrix).dot(q))
+    return eigenvalue, q.dot(u)
@@ -3,12 +3,76 @@ Estimate factor numbers by choosing different penalty functions with criterias P
 """
 import numpy as np
 
+from src.model_code.eigensolver import EIGENSOLVERS
+from src.model_code.eigensolver import FACTOR_SIDES
+from src.model_code.eigensolver import top_eigenvectors
+from src.model_code.eigensolver import top_left_singular_vectors
+from src.model_code.kernels import get_kernels
+from src.model_code.panel_source import as_chunk_source
+
 
 class FactorEstimator:
-    def __init__(self, residual):
-        self._residual = residual
-        self.T = residual.shape[0]
-        self.N = residual.shape[1]
+    """
+    Factor number estimator for panel data
+
+    Parameters
+    ----------
+    residual : array-like or chunk source
+        Residual of the regression (time by entity), or a re-iterable source of
+        residual blocks of entities of shape (time by chunk), see
+        `src.model_code.panel_source.ChunkSource`. A chunk source is read once to
+        accumulate the (T, T) matrix W * W', from which the factors and the sum of
+        squared residuals of every number of factors follow.
+    eigensolver : string, optional
+        Eigensolver used to extract the factors, one of "auto", "eigh", "arpack",
+        "randomized". See `src.model_code.eigensolver.top_eigenvectors`. The solver
+        actually used in the last factor step is stored in `eigensolver_used`.
+    factor_side : string, optional
+        Side of the residual matrix used to extract the factors, one of "auto", "T",
+        "N", "svd". See `src.model_code.eigensolver.top_left_singular_vectors`. The
+        side actually used is stored in `factor_side_used`.
+    dtype : data-type, optional
+        Floating-point precision of the residual and of all computations, e.g.
+        np.float32 to halve memory and bandwidth.
+    backend : string, optional
+        Backend of the kernels, one of "numpy", "numba". See
+        `src.model_code.kernels`.
+    """
+
+    def __init__(
+        self,
+        residual,
+        eigensolver="auto",
+        factor_side="auto",
+        dtype=np.float64,
+        backend="numpy",
+    ):
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"eigensolver should be one of {EIGENSOLVERS}")
+        if factor_side not in FACTOR_SIDES:
+            raise ValueError(f"factor_side should be one of {FACTOR_SIDES}")
+        self.dtype = np.dtype(dtype)
+        self.backend = backend
+        self._kernels = get_kernels(backend)
+        if hasattr(residual, "shape"):
+            self._residual = np.asarray(residual).astype(self.dtype, copy=False)
+            self.T, self.N = residual.shape
+            self._wwt = None
+        else:
+            if factor_side not in ("auto", "T"):
+                raise ValueError("a chunk source supports only the factor_side 'T'")
+            self._residual = None
+            self._wwt = 0
+            self.N = 0
+            for w in as_chunk_source(residual):
+                w = np.asarray(w, dtype=self.dtype)
+                self._wwt = self._wwt + w.dot(w.T)
+                self.N += w.shape[1]
+            self.T = self._wwt.shape[0]
+        self.eigensolver = eigensolver
+        self.eigensolver_used = None
+        self.factor_side = factor_side
+        self.factor_side_used = None
 
     def r_hat(self, rmax, panelty, id):
         """
@@ -29,9 +93,7 @@ class FactorEstimator:
         """
         Define IC criteria
         """
-        f_hat = self._calculate_f_tilde(r)
-        lambda_hat = self._calculate_lambda_tilde(f_hat, r)
-        vkf = self._calculate_vkf(lambda_hat, f_hat)
+        vkf = self._calculate_v(r)
         ic_p = np.log(vkf) + r * self._calculate_g(id)
         return ic_p
 
@@ -39,35 +101,45 @@ class FactorEstimator:
         """
         Define PC criteria
         """
-        f_hat = self._calculate_f_tilde(r)
-        lambda_hat = self._calculate_lambda_tilde(f_hat, r)
-        f_hat_rmax = self._calculate_f_tilde(rmax)
-        lambda_hat_rmax = self._calculate_lambda_tilde(f_hat_rmax, rmax)
-        vkf = self._calculate_vkf(lambda_hat, f_hat)
-        sigma_sq = self._calculate_vkf(lambda_hat_rmax, f_hat_rmax)
+        vkf = self._calculate_v(r)
+        sigma_sq = self._calculate_v(rmax)
         pc = vkf + r * sigma_sq * self._calculate_g(id)
         return pc
 
+    def _calculate_v(self, r):
+        r"""
+        Sum of squared residuals V(r, F_tilde) with r factors. For a chunk source it
+        follows from W * W' as :math:`(tr(WW') - tr(F'WW'F)/T)/(NT)`, because
+        :math:`\Lambda = W'F/T`.
+        """
+        f_hat = self._calculate_f_tilde(r)
+        if self._wwt is not None:
+            ssr = np.trace(self._wwt) - np.vdot(f_hat, self._wwt.dot(f_hat)) / self.T
+            return ssr / (self.N * self.T)
+        lambda_hat = self._calculate_lambda_tilde(f_hat, r)
+        return self._calculate_vkf(lambda_hat, f_hat)
+
     def _calculate_f_tilde(self, r):
         """
         Estimate F_tilde by residual and r
         """
-        uut = np.zeros(shape=(self.T, self.T))
-        for i in range(self.N):
-            uut = uut + self._residual[:, i, np.newaxis].dot(
-                self._residual[:, i, np.newaxis].T
+        if self._wwt is not None:
+            _, u, self.eigensolver_used = top_eigenvectors(
+                self._wwt, r, self.eigensolver
             )
-        w, v = np.linalg.eig(uut)
-        f_hat = np.sqrt(self.T) * v[:, np.argsort(-w)[0:r]]
+            self.factor_side_used = "T"
+            return np.sqrt(self.T) * u
+        u, self.factor_side_used, self.eigensolver_used = top_left_singular_vectors(
+            self._residual, r, self.factor_side, self.eigensolver
+        )
+        f_hat = np.sqrt(self.T) * u
         return f_hat
 
     def _calculate_lambda_tilde(self, f_hat, r):
         """
         Estimate lambda_tilde by F_tilde, residual and r
         """
-        return np.array(
-            [f_hat.T.dot(self._residual[:, i]) / self.T for i in range(self.N)]
-        )
+        return self._kernels.loadings(self._residual, f_hat)
 
     def _calculate_vkf(self, lambda_hat, f_hat):
         """
@@ -2,7 +2,54 @@
 Calculate the interactive fixed effect estimator as described in Bai(2009). The
 corresponding theory is in Chapter 3 of our report.
 """
+import copy
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+
 import numpy as np
+from scipy.linalg import cho_factor
+from scipy.linalg import cho_solve
+
+from src.model_code.acceleration import make_accelerator
+from src.model_code.eigensolver import EIGENSOLVERS
+from src.model_code.eigensolver import FACTOR_SIDES
+from src.model_code.eigensolver import top_eigenvectors
+from src.model_code.eigensolver import top_left_singular_vectors
+from src.model_code.kernels import get_kernels
+from src.model_code.panel_regressors import PanelRegressors
+from src.model_code.panel_source import ArrayPanelSource
+from src.model_code.panel_source import as_chunk_source
+from src.model_code.panel_source import load_panel_array
+
+FitResult = namedtuple(
+    "FitResult", ["r", "beta_hat", "f_hat", "lambda_hat", "convergence"]
+)
+Convergence = namedtuple(
+    "Convergence",
+    ["converged", "n_iter", "step_norm", "objective", "elapsed", "n_rejected"],
+)
+Refinement = namedtuple(
+    "Refinement", ["beta_hat_low_precision", "max_abs_diff", "convergence"]
+)
+Start = namedtuple(
+    "Start",
+    [
+        "name",
+        "beta_hat_0",
+        "beta_hat",
+        "objective",
+        "n_iter",
+        "converged",
+        "stopped_early",
+    ],
+)
+START_VALUES = ("pooled", "within", "zeros")
+Update = namedtuple(
+    "Update",
+    ["n_new", "beta_hat_previous", "step_norm", "max_abs_diff", "convergence"],
+)
 
 
 class InteractiveFixedEffect:
@@ -11,10 +58,53 @@ class InteractiveFixedEffect:
 
     Parameters
     ----------
-    dependent : array-like
-        Dependent (left-hand-side) variable (time by entity).
-    exog : array-like
-        Exogenous or right-hand-side variables (variable by time by entity).
+    dependent : array-like, path or chunk source
+        Dependent (left-hand-side) variable (time by entity). A path of a `.npy` file
+        is memory-mapped. If exog is None, a re-iterable source of entity chunks
+        (Y_chunk, X_chunk), see `src.model_code.panel_source.ChunkSource`. The
+        iterations of a chunk source are streamed like the ones of chunked data.
+    exog : array-like, path or PanelRegressors, optional
+        Exogenous or right-hand-side variables (variable by time by entity). A path of
+        a `.npy` file is memory-mapped. A `PanelRegressors` (see
+        `src.model_code.panel_regressors`) keeps constant, entity-only and time-only
+        variables compact, and the batched engine with the backend "numpy" computes
+        the residuals and the cross products from them. The engine "loop", the
+        backend "numba" and extending the panel by `update` or `append_entities` use
+        a dense copy.
+    engine : string, optional
+        Computation engine of the iterations, one of "batched", "loop". "batched"
+        computes the residual matrix once per iteration and derives factors, loadings
+        and slope coefficients from it with matrix products. "loop" runs the original
+        entity by entity loops.
+    eigensolver : string, optional
+        Eigensolver used to extract the factors, one of "auto", "eigh", "arpack",
+        "randomized". See `src.model_code.eigensolver.top_eigenvectors`. The solver
+        actually used in the last factor step is stored in `eigensolver_used`.
+    factor_side : string, optional
+        Side of the residual matrix W used by the batched engine to extract the
+        factors, one of "auto", "T", "N", "svd". "T" diagonalizes the (T, T) matrix
+        W * W', "N" the (N, N) matrix W' * W and "svd" runs a thin SVD of W. "auto"
+        takes the smaller of T and N. All of them give the same factors with
+        :math:`F'F/T = I`. The side actually used is stored in `factor_side_used`.
+    dtype : data-type, optional
+        Floating-point precision of the data and of all iterations, e.g. np.float32
+        to halve memory and bandwidth. In-memory data is cast to dtype and only the
+        cast copy is kept, so pass data of this dtype to save memory, otherwise the
+        caller's array and the copy coexist until the caller drops its array.
+        Memory-mapped and chunked data are cast chunk by chunk when read. See the
+        option refine of `fit` to polish the estimate in float64.
+    chunk_size : int, optional
+        Number of entities per chunk. If given, or if dependent or exog is
+        memory-mapped, the batched engine streams over the data in chunks of entities
+        (see `src.model_code.panel_source.ArrayPanelSource`) instead of holding it in
+        memory. Each iteration is one pass over the chunks which accumulates
+        :math:`WW'` and :math:`\sum_i W_i X_{k,i}'` for every variable k, so the peak
+        memory is :math:`O(pT^2)` plus one chunk, and the factors always come from the
+        side "T". The loadings are computed in one more pass after the last iteration.
+    backend : string, optional
+        Backend of the kernels of the batched engine and of the standard errors, one of
+        "numpy", "numba". "numba" compiles the kernels with Numba and requires it to be
+        installed. See `src.model_code.kernels`.
 
     Notes
     -----
@@ -22,14 +112,90 @@ class InteractiveFixedEffect:
         y_{it} = \beta x_{it} + \lambda_{i}'F_{t} + \epsilon_{it}
     """
 
-    def __init__(self, dependent, exog):
-        self._dependent = dependent
-        self._exog = exog
-        self.N = exog.shape[2]
-        self.T = exog.shape[1]
-        self.p = exog.shape[0]
+    def __init__(
+        self,
+        dependent,
+        exog=None,
+        engine="batched",
+        eigensolver="auto",
+        factor_side="auto",
+        dtype=np.float64,
+        chunk_size=None,
+        backend="numpy",
+    ):
+        if engine not in ("batched", "loop"):
+            raise ValueError("engine should be 'batched' or 'loop'")
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"eigensolver should be one of {EIGENSOLVERS}")
+        if factor_side not in FACTOR_SIDES:
+            raise ValueError(f"factor_side should be one of {FACTOR_SIDES}")
+        self.dtype = np.dtype(dtype)
+        self.backend = backend
+        self._kernels = get_kernels(backend)
+        dependent = load_panel_array(dependent)
+        exog = load_panel_array(exog)
+        if exog is None:
+            self._source = as_chunk_source(dependent)
+        elif chunk_size is not None or any(
+            isinstance(data, np.memmap) for data in (dependent, exog)
+        ):
+            self._source = ArrayPanelSource(dependent, exog, chunk_size)
+        else:
+            self._source = None
+        if self._source is None:
+            self._dependent = np.asarray(dependent).astype(self.dtype, copy=False)
+            if not (
+                isinstance(exog, PanelRegressors)
+                and engine == "batched"
+                and backend == "numpy"
+            ):
+                exog = np.asarray(exog)
+            self._exog = exog.astype(self.dtype, copy=False)
+        else:
+            if factor_side not in ("auto", "T"):
+                raise ValueError("chunked data supports only the factor_side 'T'")
+            if isinstance(self._source, ArrayPanelSource):
+                # kept as they are, chunks are cast to dtype when read
+                self._dependent = self._source.dependent
+                self._exog = self._source.exog
+            elif engine == "loop":
+                raise ValueError("a chunk source supports only the engine 'batched'")
+            else:
+                self._dependent = None
+                self._exog = None
+        self.chunk_size = getattr(self._source, "chunk_size", None)
+        self.engine = engine
+        self.eigensolver = eigensolver
+        self.eigensolver_used = None
+        self.factor_side = factor_side
+        self.factor_side_used = None
+        if self._exog is not None:
+            self.p, self.T, self.N = self._exog.shape
+        else:
+            # shapes of a chunk source are only known from reading it
+            y, x = next(iter(self._source))
+            self.p, self.T = np.shape(x)[0:2]
+            self.N = None
+        self._invariants = None
+        if self.N is None:
+            self.N = self._get_invariants()["N"]
+        self.convergence = None
+        self.refinement = None
+        self.last_update = None
+        self.starts = None
+        self._fitted = None
 
-    def fit(self, r, beta_hat_0=None, tolerance=0.0001):
+    def fit(
+        self,
+        r,
+        beta_hat_0=None,
+        tolerance=0.0001,
+        acceleration=None,
+        max_iter=10000,
+        max_time=None,
+        history="full",
+        refine=False,
+    ):
         """
         Estimate parameters of different model
 
@@ -41,13 +207,43 @@ class InteractiveFixedEffect:
             Starting values of estimator. Should be same order as exog variable.
         tolerance : float, optional
             Iteration precision.
+        acceleration : string, optional
+            Acceleration of the fixed-point iteration on beta_hat, one of None,
+            "anderson", "squarem". See `src.model_code.acceleration`. An extrapolated
+            beta_hat whose sum of squared residuals is worse than the one of the
+            previous beta_hat is replaced by the plain step.
+        max_iter : int, optional
+            Maximum number of iterations.
+        max_time : float, optional
+            Wall-clock budget in seconds. The iteration stops after the first iteration
+            which exceeds it.
+        history : string or int, optional
+            Which iteration intermediate values to keep in beta_hat_list. "full" keeps
+            all of them, a positive integer k keeps the last k and "off" keeps none.
+        refine : bool or tuple, optional
+            If the estimator runs in a lower precision than float64, continue the
+            iteration in float64 from the low-precision estimate until tolerance is
+            reached again. True refines on the memory-mapped or chunked data of the
+            estimator. In-memory data is only kept in the lower precision, so pass
+            the float64 data as a tuple (dependent, exog) of arrays or paths instead.
+            The record `refinement` is stored with fields beta_hat_low_precision,
+            max_abs_diff (largest absolute difference between both precisions) and
+            convergence (the float64 convergence record).
+
+        The iteration stops when the step norm falls below tolerance or when one of the
+        limits is reached. The record `convergence` is stored with fields converged,
+        n_iter (number of iterations), step_norm (norm of the last step), objective
+        (sum of squared residuals at the last iteration), elapsed (seconds) and
+        n_rejected (number of rejected extrapolations).
 
         Returns
         -------
         beta_hat : array-like
             Estimate the result of slope coefficients. Same order as exog variable.
         beta_hat_list : array-like
-            Iteration intermediate values.
+            Iteration intermediate values, i.e. the starting value followed by the
+            plain step of every iteration. Only the values kept by history, None if
+            history is "off".
         f_hat : array-like
             Estimate the result of time fixed effects.
         lambda_hat : array-like
@@ -57,26 +253,588 @@ class InteractiveFixedEffect:
             beta_hat_0 = np.zeros(shape=(1, self.p))
         else:
             beta_hat_0 = np.array(beta_hat_0).reshape(1, self.p)
-        beta_hat_list = beta_hat_0
+        accelerator = make_accelerator(acceleration)
+        beta_hat_list = _History(history, self.p)
+        beta_hat_list.append(beta_hat_0)
+        n_iter = 0
+        start_time = time.perf_counter()
         e = np.inf
         while e > tolerance:
-            f_hat = self._calculate_f_hat(beta_hat_0, r)
-            lambda_hat = self._calculate_lambda_hat(beta_hat_0, f_hat, r)
-            beta_hat = self._calculate_beta_hat(f_hat, lambda_hat)
-            beta_hat_list = np.row_stack((beta_hat_list, beta_hat))
+            f_hat, lambda_hat, beta_hat, ssr = self._iterate(beta_hat_0, r)
+            n_iter += 1
+            beta_hat_list.append(beta_hat)
             e = np.linalg.norm(beta_hat - beta_hat_0, ord=2)
-            beta_hat_0 = beta_hat
+            elapsed = time.perf_counter() - start_time
+            if n_iter >= max_iter or (max_time is not None and elapsed > max_time):
+                break
+            if e > tolerance:
+                ssr_step = None
+                if acceleration is not None:
+                    # objective of the plain step at the factors and loadings of
+                    # beta_hat_0, an upper bound of the objective at beta_hat
+                    step = np.ravel(beta_hat - beta_hat_0)
+                    ssr_step = ssr - step.dot(self._get_invariants()["A"]).dot(step)
+                beta_hat_0 = accelerator.step(beta_hat_0, beta_hat, ssr, ssr_step)
+        self.convergence = Convergence(
+            converged=bool(e <= tolerance),
+            n_iter=n_iter,
+            step_norm=e,
+            objective=ssr,
+            elapsed=elapsed,
+            n_rejected=accelerator.n_rejected,
+        )
         beta_hat = beta_hat.ravel()
+        beta_hat_list = beta_hat_list.to_array()
+        if lambda_hat is None:
+            # streamed iterations skip the loadings, compute them at the last input
+            lambda_hat = self._calculate_lambda_hat_streamed(beta_hat_0, f_hat)
+        self.refinement = None
+        if refine and self.dtype != np.float64:
+            refiner = InteractiveFixedEffect(
+                *self._refine_data(refine),
+                engine=self.engine,
+                eigensolver=self.eigensolver,
+                factor_side=self.factor_side,
+                chunk_size=self.chunk_size,
+                backend=self.backend,
+            )
+            beta_hat_low_precision = beta_hat
+            beta_hat, _, f_hat, lambda_hat = refiner.fit(
+                r, beta_hat, tolerance, acceleration, max_iter, max_time, "off"
+            )
+            self.refinement = Refinement(
+                beta_hat_low_precision=beta_hat_low_precision,
+                max_abs_diff=np.max(np.abs(beta_hat - beta_hat_low_precision)),
+                convergence=refiner.convergence,
+            )
+        self._fitted = FitResult(r, beta_hat, f_hat, lambda_hat, self.convergence)
         return (beta_hat, beta_hat_list, f_hat, lambda_hat)
 
+    def _refine_data(self, refine):
+        """
+        Data (dependent, exog) of the float64 refinement.
+        """
+        if isinstance(refine, tuple):
+            return refine
+        if self._source is None:
+            raise ValueError(
+                "in-memory data is kept in the lower precision only, pass the float64 "
+                "data as refine=(dependent, exog)"
+            )
+        if isinstance(self._source, ArrayPanelSource):
+            return self._source.dependent, self._source.exog
+        return self._source, None
+
+    def fit_path(
+        self,
+        r_values,
+        beta_hat_0=None,
+        tolerance=0.0001,
+        warm_start=True,
+        acceleration=None,
+        max_iter=10000,
+        max_time=None,
+    ):
+        """
+        Estimate parameters for a sequence of factor numbers in one call
+
+        Parameters
+        ----------
+        r_values : array-like
+            Numbers of factors, fitted in the given order.
+        beta_hat_0: array-like, optional
+            Starting values of estimator for the first number of factors.
+        tolerance : float, optional
+            Iteration precision.
+        warm_start : bool, optional
+            Start each fit from beta_hat of the previous number of factors. If False,
+            every fit starts from beta_hat_0. A warm start saves iterations but may
+            converge to a different local optimum.
+        acceleration : string, optional
+            Acceleration of the fixed-point iteration, see `fit`.
+        max_iter : int, optional
+            Maximum number of iterations of each fit.
+        max_time : float, optional
+            Wall-clock budget in seconds of each fit.
+
+        Returns
+        -------
+        path : list of FitResult
+            One result per number of factors with fields r, beta_hat, f_hat,
+            lambda_hat and convergence (the convergence record of `fit`).
+        """
+        path = []
+        for r in r_values:
+            beta_hat, _, f_hat, lambda_hat = self.fit(
+                r, beta_hat_0, tolerance, acceleration, max_iter, max_time, "off"
+            )
+            path.append(FitResult(r, beta_hat, f_hat, lambda_hat, self.convergence))
+            if warm_start:
+                beta_hat_0 = beta_hat
+        return path
+
+    def fit_multistart(
+        self,
+        r,
+        starts=START_VALUES,
+        n_random=4,
+        random_scale=1.0,
+        tolerance=0.0001,
+        max_iter=10000,
+        check_every=50,
+        margin=0.01,
+        seed=0,
+        threads=None,
+    ):
+        """
+        Estimate parameters from several starting values and keep the best fit
+
+        Parameters
+        ----------
+        r : int
+            Number of factors.
+        starts : sequence of string, optional
+            Starting values, of "pooled" (pooled OLS), "within" (two-way within
+            estimator, constant and time-invariant variables start at zero) and "zeros".
+        n_random : int, optional
+            Number of additional starts at random perturbations of the pooled OLS
+            estimate, drawn as pooled + random_scale * max(|pooled|, 1) * N(0, 1).
+        random_scale : float, optional
+            Scale of the random perturbations.
+        tolerance : float, optional
+            Iteration precision.
+        max_iter : int, optional
+            Maximum number of iterations of every start.
+        check_every : int, optional
+            Number of iterations between two comparisons of the starts.
+        margin : float, optional
+            A start which has not converged is stopped once its sum of squared
+            residuals is more than a relative margin above the best one of all starts.
+        seed : int, optional
+            Seed of the random perturbations.
+        threads : int, optional
+            Number of threads running the starts concurrently, by default one per
+            start up to the number of cores. The threads share the data, and NumPy
+            releases the GIL in the eigendecompositions and matrix products.
+
+        The starts run in rounds of check_every iterations. After every round the
+        starts are compared by their sum of squared residuals, and the clearly worse
+        ones are stopped early. The record `starts` is stored as a list of Start with
+        fields name, beta_hat_0, beta_hat, objective (sum of squared residuals at the
+        last iteration), n_iter, converged and stopped_early, and `convergence` is the
+        convergence record of the best start.
+
+        Returns
+        -------
+        The same as `fit` for the start with the lowest sum of squared residuals,
+        beta_hat_list is None.
+        """
+        for name in starts:
+            if name not in START_VALUES:
+                raise ValueError(f"starts should be of {START_VALUES}")
+        # computed once and shared by the copies of the estimator
+        self._get_invariants()
+        runs = [
+            {
+                "name": name,
+                "beta_hat_0": beta_hat_0,
+                "beta_hat": beta_hat_0,
+                "estimator": copy.copy(self),
+                "objective": np.inf,
+                "n_iter": 0,
+                "elapsed": 0.0,
+                "converged": False,
+                "stopped_early": False,
+                "result": None,
+            }
+            for name, beta_hat_0 in self._start_values(
+                starts, n_random, random_scale, seed
+            )
+        ]
+
+        def run_round(run):
+            budget = min(check_every, max_iter - run["n_iter"])
+            result = run["estimator"].fit(
+                r, run["beta_hat"], tolerance, max_iter=budget, history="off"
+            )
+            return run, result
+
+        active = runs
+        with ThreadPoolExecutor(threads or min(len(runs), cpu_count())) as pool:
+            while active:
+                for run, result in pool.map(run_round, active):
+                    convergence = run["estimator"].convergence
+                    run["beta_hat"] = result[0]
+                    run["result"] = result
+                    run["objective"] = convergence.objective
+                    run["n_iter"] += convergence.n_iter
+                    run["elapsed"] += convergence.elapsed
+                    run["converged"] = convergence.converged
+                best = min(run["objective"] for run in runs)
+                for run in active:
+                    if not run["converged"] and run["objective"] > best * (1 + margin):
+                        run["stopped_early"] = True
+                active = [
+                    run
+                    for run in active
+                    if not (run["converged"] or run["stopped_early"])
+                    and run["n_iter"] < max_iter
+                ]
+        self.starts = [Start(*(run[field] for field in Start._fields)) for run in runs]
+        best = min(runs, key=lambda run: run["objective"])
+        beta_hat, _, f_hat, lambda_hat = best["result"]
+        convergence = best["estimator"].convergence
+        self.convergence = convergence._replace(
+            n_iter=best["n_iter"], elapsed=best["elapsed"]
+        )
+        self._fitted = FitResult(r, beta_hat, f_hat, lambda_hat, self.convergence)
+        return (beta_hat, None, f_hat, lambda_hat)
+
+    def _start_values(self, starts, n_random, random_scale, seed):
+        """
+        Named starting values of `fit_multistart`.
+        """
+        invariants = self._get_invariants()
+        pooled = np.linalg.lstsq(invariants["A"], invariants["xy"], rcond=None)[0]
+        values = []
+        for name in starts:
+            if name == "pooled":
+                values.append((name, pooled))
+            elif name == "zeros":
+                values.append((name, np.zeros(self.p)))
+            else:
+                values.append((name, self._calculate_within_start()))
+        rng = np.random.default_rng(seed)
+        for k in range(n_random):
+            noise = rng.normal(size=self.p) * np.maximum(np.abs(pooled), 1)
+            values.append((f"random.{k + 1}", pooled + random_scale * noise))
+        return values
+
+    def _calculate_within_start(self):
+        """
+        Two-way within estimator of a balanced panel. Variables which vanish in the
+        within transformation get zero.
+        """
+        if self._exog is None:
+            raise ValueError("the within start needs the data in arrays")
+
+        def demean(a):
+            return (
+                a
+                - a.mean(axis=-1, keepdims=True)
+                - a.mean(axis=-2, keepdims=True)
+                + a.mean(axis=(-2, -1), keepdims=True)
+            )
+
+        x = demean(np.asarray(self._exog, dtype=float))
+        y = demean(np.asarray(self._dependent, dtype=float))
+        A = np.tensordot(x, x, axes=([1, 2], [1, 2]))
+        xy = np.tensordot(x, y, axes=([1, 2], [0, 1]))
+        return np.linalg.lstsq(A, xy, rcond=None)[0]
+
+    def update(
+        self,
+        new_dependent,
+        new_exog,
+        tolerance=0.0001,
+        acceleration=None,
+        max_iter=10000,
+        max_time=None,
+        history="full",
+    ):
+        """
+        Append new time periods to the panel and re-estimate from the last fit
+
+        Parameters
+        ----------
+        new_dependent : array-like
+            Dependent variable of the new periods (time by entity).
+        new_exog : array-like
+            Exogenous variables of the new periods (variable by time by entity).
+        tolerance, acceleration, max_iter, max_time, history
+            See `fit`.
+
+        The cross products X'X and X'Y are extended by the new periods instead of
+        being recomputed, and the iteration runs as in `fit` with the number of
+        factors of the last fit, starting from its beta_hat. The record `last_update`
+        is stored with fields n_new (number of new periods), beta_hat_previous,
+        step_norm (norm of the move of beta_hat), max_abs_diff (largest absolute move
+        of beta_hat) and convergence (the convergence record of the refit).
+
+        Returns
+        -------
+        The same as `fit`.
+        """
+        self._extend(new_dependent, new_exog, axis=0)
+        return self._refit(
+            self._fitted.beta_hat,
+            np.shape(new_exog)[1],
+            tolerance,
+            acceleration,
+            max_iter,
+            max_time,
+            history,
+        )
+
+    def append_entities(
+        self,
+        new_dependent,
+        new_exog,
+        tolerance=0.0001,
+        acceleration=None,
+        max_iter=10000,
+        max_time=None,
+        history="full",
+    ):
+        """
+        Append new entities to the panel and re-estimate from the last fit
+
+        Parameters
+        ----------
+        new_dependent : array-like
+            Dependent variable of the new entities (time by entity).
+        new_exog : array-like
+            Exogenous variables of the new entities (variable by time by entity).
+        tolerance, acceleration, max_iter, max_time, history
+            See `fit`.
+
+        The cross products X'X and X'Y are extended by the new entities. The loadings
+        of the new entities follow from the factors of the last fit, and one slope
+        step with these factors and all loadings gives the starting value of the
+        iteration, which then runs as in `fit` with the number of factors of the last
+        fit. The record `last_update` is stored as in `update`, n_new is the number
+        of new entities.
+
+        Returns
+        -------
+        The same as `fit`.
+        """
+        self._extend(new_dependent, new_exog, axis=1)
+        beta_hat_previous, f_hat, lambda_hat = self._fitted[1:4]
+        y = np.asarray(new_dependent).astype(self.dtype, copy=False)
+        x = np.asarray(new_exog).astype(self.dtype, copy=False)
+        w = self._kernels.residual(y, x, beta_hat_previous.astype(self.dtype))
+        lambda_hat = np.concatenate([lambda_hat, self._kernels.loadings(w, f_hat)])
+        beta_hat_0 = self._calculate_beta_hat_batched(f_hat, lambda_hat)
+        return self._refit(
+            beta_hat_0,
+            np.shape(new_exog)[2],
+            tolerance,
+            acceleration,
+            max_iter,
+            max_time,
+            history,
+        )
+
+    def _extend(self, new_dependent, new_exog, axis):
+        """
+        Append periods (axis 0) or entities (axis 1) of dependent to the data, and
+        their contributions to the cross products X'X and X'Y.
+        """
+        if self._fitted is None:
+            raise ValueError("a fit is needed before the panel can be extended")
+        if self._source is not None:
+            raise ValueError("extending the panel needs the data in memory")
+        new_dependent = np.asarray(new_dependent)
+        new_exog = np.asarray(new_exog)
+        expect = [self.p, self.T, self.N]
+        expect[axis + 1] = new_exog.shape[axis + 1]
+        if new_exog.shape != tuple(expect) or new_dependent.shape != new_exog.shape[1:]:
+            raise ValueError(
+                f"new_exog should have shape {tuple(expect)} and new_dependent "
+                f"shape {tuple(expect[1:])}"
+            )
+        y = new_dependent.astype(self.dtype, copy=False)
+        x = new_exog.astype(self.dtype, copy=False)
+        if self._invariants is not None:
+            invariants = self._invariants
+            invariants["A"] = invariants["A"] + np.tensordot(
+                x, x, axes=([1, 2], [1, 2])
+            )
+            invariants["xy"] = invariants["xy"] + np.tensordot(
+                x, y, axes=([1, 2], [0, 1])
+            )
+            invariants["N"] = self.N if axis == 0 else self.N + y.shape[1]
+            try:
+                invariants["cho"] = cho_factor(invariants["A"])
+            except np.linalg.LinAlgError:
+                invariants["cho"] = None
+        self._dependent = np.concatenate([self._dependent, y], axis=axis)
+        self._exog = np.concatenate([np.asarray(self._exog), x], axis=axis + 1)
+        self.p, self.T, self.N = self._exog.shape
+
+    def _refit(self, beta_hat_0, n_new, *fit_args):
+        """
+        Fit the extended panel from beta_hat_0 and record how far beta_hat moved.
+        """
+        beta_hat_previous = self._fitted.beta_hat
+        result = self.fit(self._fitted.r, beta_hat_0, *fit_args)
+        step = result[0] - beta_hat_previous
+        self.last_update = Update(
+            n_new=n_new,
+            beta_hat_previous=beta_hat_previous,
+            step_norm=np.linalg.norm(step),
+            max_abs_diff=np.max(np.abs(step)),
+            convergence=self.convergence,
+        )
+        return result
+
+    def _iterate(self, beta_hat, r):
+        r"""
+        One alternating step: factors and loadings given beta_hat, then the updated
+        beta_hat given factors and loadings. Also returns the sum of squared residuals
+        at the given beta_hat and its factors and loadings, which is
+        :math:`\|W\|^2 - T\|\Lambda\|^2` because :math:`F'F/T = I`.
+        """
+        if self._source is not None and self.engine == "batched":
+            return self._iterate_streamed(beta_hat, r)
+        if self.engine == "loop":
+            f_hat = self._calculate_f_hat(beta_hat, r)
+            lambda_hat = self._calculate_lambda_hat(beta_hat, f_hat, r)
+            w = self._calculate_w(beta_hat)
+            beta_hat_new = self._calculate_beta_hat(f_hat, lambda_hat)
+        else:
+            w = self._calculate_w(beta_hat)
+            f_hat = self._calculate_f_hat_from_w(w, r)
+            lambda_hat = self._kernels.loadings(w, f_hat)
+            beta_hat_new = self._calculate_beta_hat_batched(f_hat, lambda_hat)
+        ssr = np.vdot(w, w) - self.T * np.vdot(lambda_hat, lambda_hat)
+        return f_hat, lambda_hat, beta_hat_new, ssr
+
+    def _iterate_streamed(self, beta_hat, r):
+        r"""
+        One alternating step in a single pass over the entity chunks. The loadings
+        :math:`\lambda_i = F'W_i/T` enter the update of beta_hat only through
+        :math:`\sum_i X_{k,i}'F\lambda_i = tr(F'G_kF)/T` with
+        :math:`G_k = \sum_i W_i X_{k,i}'`, and the sum of squared residuals through
+        :math:`T\|\Lambda\|^2 = tr(F'WW'F)/T`. The pass accumulates the (T, T)
+        matrices W * W' and G_k, and the loadings are returned as None.
+        """
+        beta_hat = np.ravel(beta_hat).astype(self.dtype, copy=False)
+        wwt = np.zeros(shape=(self.T, self.T), dtype=self.dtype)
+        g = np.zeros(shape=(self.p, self.T, self.T), dtype=self.dtype)
+        for y, x in self._chunks():
+            w = self._kernels.residual(y, x, beta_hat)
+            wwt += w.dot(w.T)
+            g += np.matmul(w, x.transpose(0, 2, 1))
+        f_hat = self._calculate_f_hat_from_wwt(wwt, r)
+        B = self._get_invariants()["xy"] - (np.matmul(g, f_hat) * f_hat).sum(
+            axis=(1, 2)
+        ) / self.T
+        beta_hat_new = self._solve_beta_hat(B)
+        ssr = np.trace(wwt) - np.vdot(f_hat, wwt.dot(f_hat)) / self.T
+        return f_hat, None, beta_hat_new, ssr
+
+    def _calculate_lambda_hat_streamed(self, beta_hat, f_hat):
+        """
+        Calculate lambda_hat chunk by chunk. Shape is (N, r)
+        """
+        beta_hat = np.ravel(beta_hat).astype(self.dtype, copy=False)
+        lambda_hat = [
+            self._kernels.loadings(self._kernels.residual(y, x, beta_hat), f_hat)
+            for y, x in self._chunks()
+        ]
+        return np.concatenate(lambda_hat)
+
+    def _chunks(self):
+        """
+        Entity chunks (Y_chunk, X_chunk) in the estimator dtype. Data held in memory
+        is a single chunk.
+        """
+        if self._source is None:
+            yield self._dependent, self._exog
+            return
+        for y, x in self._source:
+            y = np.asarray(y, dtype=self.dtype)
+            x = np.asarray(x, dtype=self.dtype)
+            if x.ndim != 3 or x.shape[0:2] != (self.p, self.T):
+                raise ValueError(f"X_chunk should have shape ({self.p}, {self.T}, n)")
+            if y.shape != (self.T, x.shape[2]):
+                raise ValueError(f"Y_chunk should have shape ({self.T}, n) of X_chunk")
+            yield y, x
+
+    def _calculate_w(self, beta_hat):
+        """
+        Calculate residual matrix W = Y - beta_hat * X. Shape is (T, N)
+        """
+        beta_hat = np.ravel(beta_hat).astype(self.dtype, copy=False)
+        if isinstance(self._exog, PanelRegressors):
+            return self._exog.residual(self._dependent, beta_hat)
+        return self._kernels.residual(self._dependent, self._exog, beta_hat)
+
+    def _calculate_f_hat_from_w(self, w, r):
+        """
+        Calculate f_hat from the r leading left singular vectors of W. Shape is (T, r)
+        """
+        u, self.factor_side_used, self.eigensolver_used = top_left_singular_vectors(
+            w, r, self.factor_side, self.eigensolver
+        )
+        f_hat = np.sqrt(self.T) * u
+        return f_hat
+
+    def _calculate_f_hat_from_wwt(self, wwt, r):
+        """
+        Calculate f_hat from the r leading eigenvectors of W * W'. Shape is (T, r)
+        """
+        _, v, self.eigensolver_used = top_eigenvectors(wwt, r, self.eigensolver)
+        self.factor_side_used = "T"
+        f_hat = np.sqrt(self.T) * v
+        return f_hat
+
+    def _calculate_beta_hat_batched(self, f_hat, lambda_hat):
+        """
+        Calculate beta_hat with all entities at once. Shape is (1, p)
+        """
+        invariants = self._get_invariants()
+        if isinstance(self._exog, PanelRegressors):
+            B = invariants["xy"] - self._exog.cross(f_hat.dot(lambda_hat.T))
+        else:
+            B = self._kernels.beta_rhs(invariants["xy"], self._exog, f_hat, lambda_hat)
+        return self._solve_beta_hat(B)
+
+    def _solve_beta_hat(self, B):
+        """
+        Solve the normal equations A * beta_hat = B. Shape is (1, p)
+        """
+        invariants = self._get_invariants()
+        if invariants["cho"] is None:
+            beta_hat = np.linalg.solve(invariants["A"], B)
+        else:
+            beta_hat = cho_solve(invariants["cho"], B)
+        return beta_hat.reshape(1, self.p)
+
+    def _get_invariants(self):
+        """
+        Cross products which depend only on the data, computed on first use and reused
+        by every iteration and every call of fit: the Gram matrix A = sum_i X_i X_i'
+        with its Cholesky factor and X'Y = sum_i X_i Y_i.
+        """
+        if self._invariants is None:
+            A = 0
+            xy = 0
+            N = 0
+            for y, x in self._chunks():
+                if isinstance(x, PanelRegressors):
+                    A = A + x.gram()
+                    xy = xy + x.cross(y)
+                else:
+                    A = A + np.tensordot(x, x, axes=([1, 2], [1, 2]))
+                    xy = xy + np.tensordot(x, y, axes=([1, 2], [0, 1]))
+                N += y.shape[1]
+            try:
+                cho = cho_factor(A)
+            except np.linalg.LinAlgError:
+                # not numerically positive definite, fall back to a general solver
+                cho = None
+            self._invariants = {"A": A, "cho": cho, "xy": xy, "N": N}
+        return self._invariants
+
     def _calculate_f_hat(self, beta_hat, r):
         wwt = np.zeros(shape=(self.T, self.T))
         for i in range(self.N):
             w_i = self._dependent[:, i] - beta_hat.dot(self._exog[:, :, i])
             wwt = wwt + w_i.T.dot(w_i)
-        w, v = np.linalg.eigh(wwt)
-        f_hat = np.sqrt(self.T) * v[:, np.argsort(-w)[0:r]]
-        return f_hat
+        return self._calculate_f_hat_from_wwt(wwt, r)
 
     def _calculate_lambda_hat(self, beta_hat, f_hat, r):
         lambda_hat = np.full(shape=(self.N, r), fill_value=np.nan)
@@ -100,25 +858,24 @@ class InteractiveFixedEffect:
     def calculate_sde(self, beta_hat, f_hat, lambda_hat):
         """
         Calculate standard error of beta_hat estimated from fit
+
+        The (N, N) matrix a enters only through its row sums, which are computed in
+        O(N * r), and D0, D1 are accumulated over chunks of entities, so Z is only
+        formed for one chunk at a time.
         """
         beta_hat = np.array(beta_hat).reshape(1, self.p)
-        a = self._calculate_a(lambda_hat)
+        a_row_sums = self._calculate_a_row_sums(lambda_hat)
         M = self._calculate_M(f_hat)
-        Z = self._calculate_Z(M, a)
-        D0, D1 = self._calculate_D0_D1(beta_hat, f_hat, lambda_hat, Z)
+        D0, D1 = self._calculate_D0_D1(beta_hat, f_hat, lambda_hat, M, a_row_sums)
         sde = np.linalg.inv(D0).dot(D1).dot(np.linalg.inv(D0.T))
         return sde
 
-    def _calculate_a(self, lambda_hat):
+    def _calculate_a_row_sums(self, lambda_hat):
         """
-        Calculate array a. Shape is (N,N)
+        Calculate the row sums of array a = lambda_hat * A * lambda_hat'. Shape is (N,)
         """
         A = np.linalg.inv(lambda_hat.T.dot(lambda_hat) / self.N)
-        a = np.empty(shape=(self.N, self.N))
-        for i in range(self.N):
-            for j in range(self.N):
-                a[i, j] = lambda_hat[i, :].T.dot(A).dot(lambda_hat[j, :])
-        return a
+        return lambda_hat.dot(A.dot(lambda_hat.sum(axis=0)))
 
     def _calculate_M(self, f_hat):
         """
@@ -126,46 +883,72 @@ class InteractiveFixedEffect:
         """
         return np.identity(self.T) - f_hat.dot(f_hat.T) / self.T
 
-    def _calculate_Z(self, M, a):
+    def _calculate_Z(self, M, a_row_sums, exog):
         """
-        Calculate array Z. Shape is (p, T, N)
+        Calculate array Z of the entities of exog. Shape is (p, T, chunk)
         """
-        Z = np.empty((self.p, self.T, self.N))
-        for i in range(self.N):
-            Z[:, :, i] = self._exog[:, :, i].dot(M.T) - 1 / self.N * sum(
-                a[i, :]
-            ) * self._exog[:, :, i].dot(M.T)
-        return Z
+        return np.matmul(M, exog) * (1 - a_row_sums / self.N)
 
-    def _calculate_D0_D1(self, beta_hat, f_hat, lambda_hat, Z):
+    def _calculate_D0_D1(self, beta_hat, f_hat, lambda_hat, M, a_row_sums):
         """
         Calculate array D0 and D1. Both shapes are (p, p)
         """
-        sita_square = np.zeros(self.N)
-        for i in range(self.N):
-            for t in range(self.T):
-                sita_square[i] = (
-                    sita_square[i]
-                    + 1
-                    / self.T
-                    * (
-                        self._dependent[t, i]
-                        - beta_hat.dot(self._exog[:, t, i])
-                        - lambda_hat[i, :].T.dot(f_hat[t, :])
-                    )
-                    ** 2
-                )
-
-        D0 = np.zeros((self.p, self.p))
-        D1 = np.zeros((self.p, self.p))
-        for i in range(self.N):
-            for t in range(self.T):
-                A = (
-                    1
-                    / self.N
-                    / self.T
-                    * np.dot(np.transpose([Z[:, t, i]]), [Z[:, t, i]])
-                )
-                D0 = D0 + A
-                D1 = D1 + sita_square[i] * A
-        return D0, D1
+        if self._source is None:
+            chunks = ArrayPanelSource(self._dependent, self._exog)
+        else:
+            chunks = self._chunks()
+        beta_hat = np.ravel(beta_hat)
+        D0 = 0
+        D1 = 0
+        start = 0
+        for y, x in chunks:
+            entities = slice(start, start + y.shape[1])
+            start = entities.stop
+            residual = self._kernels.residual(y, x, beta_hat) - f_hat.dot(
+                lambda_hat[entities].T
+            )
+            sita_square = (residual ** 2).sum(axis=0) / self.T
+            Z = self._calculate_Z(M, a_row_sums[entities], x)
+            D0_chunk, D1_chunk = self._kernels.sde_sums(Z, sita_square)
+            D0 = D0 + D0_chunk
+            D1 = D1 + D1_chunk
+        return D0 / self.N / self.T, D1 / self.N / self.T
+
+
+class _History:
+    """
+    Iteration history of beta_hat. Mode "full" grows a preallocated array by doubling
+    its capacity, a positive integer k keeps the last k values in a ring buffer and
+    "off" keeps nothing, so appending costs O(p) in every mode.
+    """
+
+    def __init__(self, mode, p, capacity=64):
+        if mode in ("full", "off"):
+            size = capacity if mode == "full" else 0
+        elif isinstance(mode, (int, np.integer)) and mode > 0:
+            size = mode
+        else:
+            raise ValueError("history should be 'full', 'off' or a positive integer")
+        self.mode = mode
+        self._buffer = np.empty(shape=(size, p))
+        self._n = 0
+
+    def append(self, beta_hat):
+        if self.mode == "off":
+            return
+        if self.mode == "full":
+            if self._n == len(self._buffer):
+                buffer = np.empty(shape=(2 * len(self._buffer), self._buffer.shape[1]))
+                buffer[0 : self._n] = self._buffer
+                self._buffer = buffer
+            self._buffer[self._n] = np.ravel(beta_hat)
+        else:
+            self._buffer[self._n % self.mode] = np.ravel(beta_hat)
+        self._n += 1
+
+    def to_array(self):
+        if self.mode == "off":
+            return None
+        if self.mode == "full" or self._n <= self.mode:
+            return self._buffer[0 : self._n].copy()
+        return np.roll(self._buffer, -(self._n % self.mode), axis=0)
@@ -0,0 +1,136 @@
+"""
+Computational kernels of the estimators. The backend "numpy" expresses them with
+matrix products and is the default. The backend "numba" compiles explicit loops over
+entities and periods with Numba, which fuses the loops and avoids the temporary
+arrays of the matrix expressions. It is only available if numba can be imported.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("numpy", "numba")
+
+Kernels = namedtuple("Kernels", ["residual", "loadings", "beta_rhs", "sde_sums"])
+
+
+def available_backends():
+    """
+    Backends which can be used in this environment.
+    """
+    return BACKENDS if numba is not None else ("numpy",)
+
+
+def get_kernels(backend="numpy"):
+    """
+    Kernels of a backend.
+
+    Parameters
+    ----------
+    backend : string, optional
+        One of "numpy", "numba".
+
+    Returns
+    -------
+    kernels : Kernels
+        Fields residual(dependent, exog, beta_hat) for W = Y - beta_hat * X,
+        loadings(w, f_hat) for W'F/T, beta_rhs(xy, exog, f_hat, lambda_hat) for the
+        right-hand side X'Y - sum_i X_i F lambda_i of the normal equations and
+        sde_sums(Z, sita_square) for the unscaled sums of z z' and sita^2 z z' over
+        periods and entities used by the standard errors.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend should be one of {BACKENDS}")
+    if backend == "numpy":
+        return NUMPY_KERNELS
+    if numba is None:
+        raise ImportError("the backend 'numba' requires the package numba")
+    if "numba" not in _compiled:
+        _compiled["numba"] = Kernels(
+            *(numba.njit(cache=True)(kernel) for kernel in LOOP_KERNELS)
+        )
+    return _compiled["numba"]
+
+
+def _residual(dependent, exog, beta_hat):
+    return dependent - np.tensordot(beta_hat, exog, axes=1)
+
+
+def _loadings(w, f_hat):
+    return w.T.dot(f_hat) / w.shape[0]
+
+
+def _beta_rhs(xy, exog, f_hat, lambda_hat):
+    return xy - np.tensordot(exog, f_hat.dot(lambda_hat.T), axes=([1, 2], [0, 1]))
+
+
+def _sde_sums(Z, sita_square):
+    D0 = np.tensordot(Z, Z, axes=([1, 2], [1, 2]))
+    D1 = np.einsum("pti,qti,i->pq", Z, Z, sita_square)
+    return D0, D1
+
+
+NUMPY_KERNELS = Kernels(_residual, _loadings, _beta_rhs, _sde_sums)
+
+
+def _residual_loop(dependent, exog, beta_hat):
+    p, T, N = exog.shape
+    w = np.empty((T, N), dtype=dependent.dtype)
+    for t in range(T):
+        for i in range(N):
+            value = dependent[t, i]
+            for k in range(p):
+                value -= beta_hat[k] * exog[k, t, i]
+            w[t, i] = value
+    return w
+
+
+def _loadings_loop(w, f_hat):
+    T, N = w.shape
+    r = f_hat.shape[1]
+    lambda_hat = np.zeros((N, r), dtype=w.dtype)
+    for i in range(N):
+        for k in range(r):
+            value = 0.0
+            for t in range(T):
+                value += w[t, i] * f_hat[t, k]
+            lambda_hat[i, k] = value / T
+    return lambda_hat
+
+
+def _beta_rhs_loop(xy, exog, f_hat, lambda_hat):
+    p, T, N = exog.shape
+    r = f_hat.shape[1]
+    B = xy.copy()
+    for t in range(T):
+        for i in range(N):
+            common = 0.0
+            for k in range(r):
+                common += f_hat[t, k] * lambda_hat[i, k]
+            for k in range(p):
+                B[k] -= exog[k, t, i] * common
+    return B
+
+
+def _sde_sums_loop(Z, sita_square):
+    p, T, N = Z.shape
+    D0 = np.zeros((p, p))
+    D1 = np.zeros((p, p))
+    for i in range(N):
+        for t in range(T):
+            for k in range(p):
+                for q in range(p):
+                    value = Z[k, t, i] * Z[q, t, i]
+                    D0[k, q] += value
+                    D1[k, q] += sita_square[i] * value
+    return D0, D1
+
+
+# plain Python versions of the kernels compiled by the backend "numba"
+LOOP_KERNELS = Kernels(_residual_loop, _loadings_loop, _beta_rhs_loop, _sde_sums_loop)
+
+_compiled = {}
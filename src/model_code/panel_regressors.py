@@ -0,0 +1,271 @@
+"""
+Panel regressors stored in their native form. A constant, a regressor which varies
+only over entities (e.g. a time-invariant :math:`x_i`) and one which varies only over
+time (e.g. a common :math:`w_t`) take one, N and T numbers instead of a dense (T, N)
+plane each. `PanelRegressors` presents the (variable by time by entity) interface of a
+dense exog and converts to one with `np.asarray`, while the cross products used by
+the estimators are computed from the compact columns.
+"""
+import numpy as np
+
+KINDS = ("full", "entity", "time", "constant")
+# dimensions of the values of a column of each kind
+NDIM = {"full": 2, "entity": 1, "time": 1, "constant": 0}
+
+
+class PanelRegressors:
+    """
+    Regressors of a balanced panel with constant, entity-only and time-only columns
+
+    Parameters
+    ----------
+    columns : sequence of tuple
+        One pair (kind, values) per variable, in the order of the variables. kind is
+        one of "full" (values of shape (T, N)), "entity" (shape (N,)), "time" (shape
+        (T,)) and "constant" (a scalar).
+    T : int, optional
+        Sample size of time, only needed if no column determines it.
+    N : int, optional
+        Sample size of entity, only needed if no column determines it.
+    dtype : data-type, optional
+        Floating-point precision of the values.
+
+    The columns of a kind are stacked into one array, so the full columns take the
+    memory of a dense exog of their number of variables only.
+    """
+
+    ndim = 3
+
+    def __init__(self, columns, T=None, N=None, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.kinds = tuple(kind for kind, _ in columns)
+        values = [np.asarray(value, dtype=self.dtype) for _, value in columns]
+        for kind, value in zip(self.kinds, values):
+            if kind not in KINDS:
+                raise ValueError(f"kind should be one of {KINDS}")
+            if value.ndim != NDIM[kind]:
+                raise ValueError(
+                    f"values of a column of kind '{kind}' should have {NDIM[kind]} "
+                    "dimensions"
+                )
+        sizes_T = [
+            v.shape[0] for k, v in zip(self.kinds, values) if k in ("full", "time")
+        ]
+        sizes_N = [
+            v.shape[-1] for k, v in zip(self.kinds, values) if k in ("full", "entity")
+        ]
+        T = self._size(T, sizes_T, "T")
+        N = self._size(N, sizes_N, "N")
+        self.shape = (len(self.kinds), T, N)
+        self.p, self.T, self.N = self.shape
+        self._groups = {}
+        for kind in KINDS:
+            index = np.array([k for k in range(self.p) if self.kinds[k] == kind], int)
+            if index.size:
+                stacked = np.stack([values[k] for k in index])
+                self._groups[kind] = (index, stacked)
+
+    @staticmethod
+    def _size(size, sizes, name):
+        if size is not None:
+            sizes = [size, *sizes]
+        if not sizes:
+            raise ValueError(f"{name} should be given if no column determines it")
+        if len(set(sizes)) > 1:
+            raise ValueError(f"the columns have different sizes {name}")
+        return int(sizes[0])
+
+    @classmethod
+    def from_dense(cls, exog):
+        """
+        Detect the constant, entity-only and time-only columns of a dense exog
+        (variable by time by entity) by exact comparison.
+        """
+        exog = np.asarray(exog)
+        columns = []
+        for plane in exog:
+            if (plane == plane[0, 0]).all():
+                columns.append(("constant", plane[0, 0]))
+            elif (plane == plane[0:1, :]).all():
+                columns.append(("entity", plane[0, :]))
+            elif (plane == plane[:, 0:1]).all():
+                columns.append(("time", plane[:, 0]))
+            else:
+                columns.append(("full", plane))
+        _, T, N = exog.shape
+        return cls(columns, T, N, exog.dtype)
+
+    @property
+    def columns(self):
+        """
+        List of the pairs (kind, values) of the variables.
+        """
+        columns = [None] * self.p
+        for kind, (index, stacked) in self._groups.items():
+            for k, value in zip(index, stacked):
+                columns[k] = (kind, value)
+        return columns
+
+    @property
+    def nbytes(self):
+        return sum(stacked.nbytes for _, stacked in self._groups.values())
+
+    def __len__(self):
+        return self.p
+
+    def __array__(self, dtype=None):
+        dense = np.empty(self.shape, dtype=dtype or self.dtype)
+        for kind, (index, stacked) in self._groups.items():
+            dense[index] = _broadcastable(kind, stacked)
+        return dense
+
+    def astype(self, dtype, copy=True):
+        if not copy and np.dtype(dtype) == self.dtype:
+            return self
+        return PanelRegressors(self.columns, self.T, self.N, dtype)
+
+    def __getitem__(self, key):
+        """
+        Select variables, periods and entities. An integer variable gives its dense
+        (T, N) plane, all other selections a `PanelRegressors`. Periods and entities
+        are selected by slices or index arrays.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 3:
+            raise IndexError("too many indices for PanelRegressors")
+        variables, periods, entities = key + (slice(None),) * (3 - len(key))
+        if np.ndim(variables) == 0 and not isinstance(variables, slice):
+            return np.asarray(self)[variables, periods, entities]
+        all_columns = self.columns
+        columns = []
+        for kind, value in (all_columns[k] for k in np.arange(self.p)[variables]):
+            if kind == "full":
+                value = value[periods][:, entities]
+            elif kind == "entity":
+                value = value[entities]
+            elif kind == "time":
+                value = value[periods]
+            columns.append((kind, value))
+        T = np.arange(self.T)[periods].size
+        N = np.arange(self.N)[entities].size
+        return PanelRegressors(columns, T, N, self.dtype)
+
+    def combine(self, beta):
+        r"""
+        Linear combination :math:`\sum_k \beta_k X_k` of the variables. Shape is (T, N)
+        """
+        full, row, column = self._terms(beta)
+        if full is None:
+            full = np.zeros((self.T, self.N), dtype=np.result_type(beta, self.dtype))
+        return self._add_terms(full, row, column, 1)
+
+    def residual(self, dependent, beta):
+        r"""
+        Residual matrix :math:`Y - \sum_k \beta_k X_k`. Shape is (T, N)
+        """
+        full, row, column = self._terms(beta)
+        if full is None:
+            residual = np.array(dependent, dtype=np.result_type(dependent, beta))
+        else:
+            # the combination of the full variables is a fresh array, reuse it
+            residual = np.subtract(dependent, full, out=full)
+        return self._add_terms(residual, row, column, -1)
+
+    def _terms(self, beta):
+        """
+        The (T, N) term of the full variables and the (N,) and (T,) terms of the
+        entity-only and constant, and of the time-only variables, None if absent.
+        """
+        beta = np.ravel(beta)
+        terms = {
+            kind: beta[index].dot(stacked.reshape(index.size, -1)).reshape(
+                stacked.shape[1:]
+            )
+            for kind, (index, stacked) in self._groups.items()
+        }
+        row = None
+        if "entity" in terms or "constant" in terms:
+            row = terms.get("entity", 0) + terms.get("constant", 0)
+        return terms.get("full"), row, terms.get("time")
+
+    @staticmethod
+    def _add_terms(out, row, column, sign):
+        """
+        Add the row and column terms to out in place, each in one pass.
+        """
+        if row is not None:
+            out += sign * row
+        if column is not None:
+            out += sign * column[:, np.newaxis]
+        return out
+
+    def cross(self, M):
+        r"""
+        Cross products :math:`\sum_{t,i} X_{k,ti} M_{ti}` of every variable with a
+        (T, N) matrix. Shape is (p,)
+        """
+        M = np.asarray(M)
+        products = np.empty(self.p, dtype=np.result_type(M, self.dtype))
+        for kind, (index, stacked) in self._groups.items():
+            if kind == "full":
+                products[index] = stacked.reshape(index.size, -1).dot(M.ravel())
+            elif kind == "entity":
+                products[index] = stacked.dot(M.sum(axis=0))
+            elif kind == "time":
+                products[index] = stacked.dot(M.sum(axis=1))
+            else:
+                products[index] = stacked * M.sum()
+        return products
+
+    def gram(self):
+        r"""
+        Gram matrix :math:`\sum_{t,i} X_{k,ti} X_{l,ti}` of the variables. Shape is
+        (p, p)
+        """
+        A = np.empty((self.p, self.p), dtype=self.dtype)
+        groups = list(self._groups.items())
+        for a, (kind_a, (index_a, values_a)) in enumerate(groups):
+            for kind_b, (index_b, values_b) in groups[a:]:
+                block = self._gram_block(kind_a, values_a, kind_b, values_b)
+                A[np.ix_(index_a, index_b)] = block
+                A[np.ix_(index_b, index_a)] = block.T
+        return A
+
+    def _gram_block(self, kind_a, values_a, kind_b, values_b):
+        """
+        Block of the Gram matrix of two groups, kind_a comes first in KINDS.
+        """
+        T, N = self.T, self.N
+        if kind_a == "full":
+            if kind_b == "full":
+                return np.tensordot(values_a, values_b, axes=([1, 2], [1, 2]))
+            if kind_b == "entity":
+                return values_a.sum(axis=1).dot(values_b.T)
+            if kind_b == "time":
+                return values_a.sum(axis=2).dot(values_b.T)
+            return np.outer(values_a.sum(axis=(1, 2)), values_b)
+        if kind_a == "entity":
+            if kind_b == "entity":
+                return T * values_a.dot(values_b.T)
+            if kind_b == "time":
+                return np.outer(values_a.sum(axis=1), values_b.sum(axis=1))
+            return T * np.outer(values_a.sum(axis=1), values_b)
+        if kind_a == "time":
+            if kind_b == "time":
+                return N * values_a.dot(values_b.T)
+            return N * np.outer(values_a.sum(axis=1), values_b)
+        return T * N * np.outer(values_a, values_b)
+
+
+def _broadcastable(kind, values):
+    """
+    Values of a kind with the axes of time and entity, broadcastable to (..., T, N).
+    """
+    if kind == "entity":
+        return values[..., np.newaxis, :]
+    if kind == "time":
+        return values[..., np.newaxis]
+    if kind == "constant":
+        return values[..., np.newaxis, np.newaxis]
+    return values
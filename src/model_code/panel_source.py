@@ -0,0 +1,101 @@
+"""
+Entity chunks of panel data. The estimators only need sums over entities of cross
+products of the data, so they can run over a panel in blocks of entities without
+holding the full (variable by time by entity) tensor in memory, e.g. from arrays
+memory-mapped from `.npy` files, or from chunks assembled on the fly, e.g. read from
+the row groups of a Parquet file or from a database cursor.
+"""
+import os
+
+import numpy as np
+
+# elements of one chunk of exog when the chunk size is not given (32 MB in float64)
+DEFAULT_CHUNK_ELEMENTS = 2 ** 22
+
+
+def load_panel_array(array):
+    """
+    Memory-map an array saved as `.npy` file, other arrays are returned as they are.
+    """
+    if isinstance(array, (str, os.PathLike)):
+        return np.load(array, mmap_mode="r")
+    return array
+
+
+class ArrayPanelSource:
+    """
+    Entity chunks of in-memory or memory-mapped panel arrays
+
+    Parameters
+    ----------
+    dependent : array-like or path
+        Dependent variable (time by entity), or path of a `.npy` file holding it.
+    exog : array-like or path
+        Exogenous variables (variable by time by entity), or path of a `.npy` file
+        holding it.
+    chunk_size : int, optional
+        Number of entities per chunk. By default a chunk of exog has about
+        `DEFAULT_CHUNK_ELEMENTS` elements.
+
+    Iterating over the source yields the tuples (Y_chunk, X_chunk) of shapes
+    (T, chunk) and (p, T, chunk). The chunks of memory-mapped arrays are views, which
+    are read from disk when used.
+    """
+
+    def __init__(self, dependent, exog, chunk_size=None):
+        self.dependent = load_panel_array(dependent)
+        self.exog = load_panel_array(exog)
+        self.p, self.T, self.N = self.exog.shape
+        if self.dependent.shape != (self.T, self.N):
+            raise ValueError("dependent should have shape (T, N) of exog")
+        if chunk_size is None:
+            chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // (self.p * self.T))
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be a positive integer")
+        self.chunk_size = int(chunk_size)
+
+    def __iter__(self):
+        for start in range(0, self.N, self.chunk_size):
+            entities = slice(start, start + self.chunk_size)
+            yield self.dependent[:, entities], self.exog[:, :, entities]
+
+
+class ChunkSource:
+    """
+    Entity chunks of a panel assembled on the fly
+
+    Parameters
+    ----------
+    chunks : iterable or callable
+        Re-iterable of chunks, e.g. a list or an object whose `__iter__` starts a new
+        read, or a function without arguments returning a new iterator of chunks, e.g.
+        a generator function. The estimators iterate over the chunks once per
+        iteration, so a one-shot iterator such as a generator object is rejected.
+
+    For `InteractiveFixedEffect` a chunk is a tuple (Y_chunk, X_chunk) of shapes
+    (T, chunk) and (p, T, chunk), for `FactorEstimator` it is a residual block of
+    shape (T, chunk). All chunks together have to cover every entity exactly once,
+    in the same order in every pass.
+    """
+
+    def __init__(self, chunks):
+        if not callable(chunks) and iter(chunks) is chunks:
+            raise ValueError(
+                "chunks should be re-iterable or a function returning an iterator, "
+                "not a one-shot iterator"
+            )
+        self._chunks = chunks
+
+    def __iter__(self):
+        if callable(self._chunks):
+            return iter(self._chunks())
+        return iter(self._chunks)
+
+
+def as_chunk_source(chunks):
+    """
+    Wrap chunks in a `ChunkSource` unless they are already a source of this module.
+    """
+    if isinstance(chunks, (ArrayPanelSource, ChunkSource)):
+        return chunks
+    return ChunkSource(chunks)
@@ -0,0 +1,112 @@
+"""
+Coordinate worker processes with the thread pools of BLAS/LAPACK. Every worker of a
+process pool calls multithreaded BLAS in `eigh`, `inv` and the matrix products, so a
+pool with one process per core oversubscribes the cores unless the BLAS threads of
+each worker are capped. The cores are split into processes times BLAS threads per
+process, and the workers cap their thread pools when they start.
+"""
+import multiprocessing
+import os
+
+from threadpoolctl import threadpool_limits
+
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+# flops per iteration, T^2 N + T^3, above which a worker gets a second BLAS thread;
+# every further doubling of the work doubles the threads up to MAX_BLAS_THREADS,
+# beyond which more processes pay off better for independent simulations
+WORK_PER_BLAS_THREAD = 5e7
+MAX_BLAS_THREADS = 4
+
+# thread pool limits of this process, kept alive as long as the process runs
+_limits = []
+
+
+def choose_thread_split(all_N, all_T, n_tasks=None, cores=None):
+    """
+    Split the cores into worker processes and BLAS threads per process from the
+    panel sizes of a simulation.
+
+    Parameters
+    ----------
+    all_N : array-like
+        Sample sizes of entity.
+    all_T : array-like
+        Sample sizes of time.
+    n_tasks : int, optional
+        Number of tasks. There are no more processes than tasks. The BLAS threads
+        still follow the work per iteration, so cores may be left idle.
+    cores : int, optional
+        Number of cores, by default `multiprocessing.cpu_count()`.
+
+    Returns
+    -------
+    processes : int
+        Number of worker processes.
+    blas_threads : int
+        Number of BLAS threads of every worker process.
+    """
+    if cores is None:
+        cores = multiprocessing.cpu_count()
+    work = max(T * T * N + T ** 3 for N, T in zip(all_N, all_T))
+    blas_threads = 1
+    while (
+        blas_threads * 2 <= min(cores, MAX_BLAS_THREADS)
+        and work >= WORK_PER_BLAS_THREAD * blas_threads
+    ):
+        blas_threads *= 2
+    processes = max(1, cores // blas_threads)
+    if n_tasks is not None and n_tasks < processes:
+        # more threads would oversubscribe small matrices, the remaining cores idle
+        processes = max(1, n_tasks)
+    return processes, blas_threads
+
+
+def resolve_thread_split(processes, blas_threads, all_N, all_T, n_tasks=None):
+    """
+    Complete a split of the cores of which one or both parts may be None. Both None
+    is the automatic split of `choose_thread_split`, and a given number of processes
+    (threads) leaves the remaining cores to threads (processes).
+    """
+    cores = multiprocessing.cpu_count()
+    if processes is None and blas_threads is None:
+        return choose_thread_split(all_N, all_T, n_tasks, cores)
+    if processes is None:
+        processes = max(1, cores // blas_threads)
+    if blas_threads is None:
+        blas_threads = max(1, cores // processes)
+    return processes, blas_threads
+
+
+def limit_blas_threads(blas_threads):
+    """
+    Cap the BLAS/LAPACK thread pools (OpenBLAS, MKL, BLIS, ...) loaded in this
+    process with threadpoolctl. The environment variables cover libraries loaded
+    later and child processes.
+    """
+    for variable in BLAS_THREAD_VARIABLES:
+        os.environ[variable] = str(blas_threads)
+    _limits.append(threadpool_limits(limits=blas_threads, user_api="blas"))
+
+
+def init_worker(blas_threads, initializer=None, initargs=()):
+    """
+    Initializer of a pool worker: cap its BLAS threads, then run initializer.
+    """
+    limit_blas_threads(blas_threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def make_pool(processes, blas_threads, initializer=None, initargs=()):
+    """
+    Process pool whose workers use at most blas_threads BLAS threads each.
+    """
+    return multiprocessing.Pool(
+        processes, init_worker, (blas_threads, initializer, initargs)
+    )
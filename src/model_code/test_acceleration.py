@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.model_code.acceleration import make_accelerator
+
+
+def _iterate_linear_map(accelerator, tolerance=1e-10):
+    A = np.array([[0.99, 0.0], [0.0, 0.5]])
+    b = np.array([0.01, 1.0])
+    x = np.zeros(2)
+    n_iter = 0
+    while True:
+        gx = A.dot(x) + b
+        n_iter += 1
+        if np.linalg.norm(gx - x) <= tolerance:
+            return gx, n_iter
+        # objective is the distance to the fixed point
+        x = accelerator.step(x, gx, np.linalg.norm(x - [1, 2]))
+
+
+@pytest.mark.parametrize("acceleration", ["anderson", "squarem"])
+def test_acceleration_linear_map(acceleration):
+    x, n_iter = _iterate_linear_map(make_accelerator(acceleration))
+    _, n_iter_plain = _iterate_linear_map(make_accelerator(None))
+    np.testing.assert_allclose(x, [1, 2])
+    assert n_iter < n_iter_plain / 10
+
+
+def test_anderson_rejects_worse_objective():
+    accelerator = make_accelerator("anderson", memory=2)
+    accelerator.step(np.zeros(2), np.ones(2), 10)
+    x = accelerator.step(np.ones(2), np.array([1.5, 1.2]), 5)
+    # the extrapolated point turned out worse than the last one
+    np.testing.assert_array_equal(accelerator.step(x, x + 1, 7), [1.5, 1.2])
+    assert accelerator.n_rejected == 1
+
+
+def test_anderson_rejects_worse_than_plain_step():
+    accelerator = make_accelerator("anderson", memory=2)
+    accelerator.step(np.zeros(2), np.ones(2), 10, 6)
+    x = accelerator.step(np.ones(2), np.array([1.5, 1.2]), 6, 4)
+    # better than the last point but worse than its plain step
+    np.testing.assert_array_equal(accelerator.step(x, x + 1, 5, 3), [1.5, 1.2])
+    assert accelerator.n_rejected == 1
+
+
+def test_squarem_rejects_worse_objective():
+    accelerator = make_accelerator("squarem")
+    x1 = accelerator.step(np.zeros(2), np.ones(2), 10)
+    accelerator.step(x1, np.array([1.5, 1.5]), 5)
+    x = accelerator.step(np.ones(2), np.array([3.0, 3.0]), 11)
+    np.testing.assert_array_equal(x, [1.5, 1.5])
+    assert accelerator.n_rejected == 1
+
+
+def test_unknown_acceleration():
+    with pytest.raises(ValueError):
+        make_accelerator("newton")
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.model_code.batched_interactive_fixed_effect import (
+    BatchedInteractiveFixedEffect,
+)
+from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+
+
+def _panel_stack(B, T, N, seed=123):
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(size=(B, T, 2))
+    lambda_ = rng.normal(size=(B, N, 2))
+    lambda_factor = np.matmul(factor, lambda_.transpose(0, 2, 1))
+    X = np.stack(
+        [
+            1 + lambda_factor + rng.normal(size=(B, T, N)),
+            1 + lambda_factor + rng.normal(size=(B, T, N)),
+            np.ones(shape=(B, T, N)),
+        ],
+        axis=1,
+    )
+    Y = np.einsum("p,bptn->btn", [1, 3, 5], X) + lambda_factor
+    Y = Y + rng.normal(scale=2, size=(B, T, N))
+    return X, Y
+
+
+@pytest.mark.parametrize("T, N", [(10, 15), (15, 10)])
+def test_fit_same_as_single_panel(T, N):
+    X, Y = _panel_stack(4, T, N)
+    batched_estimator = BatchedInteractiveFixedEffect(Y, X)
+    beta_hat, f_hat, lambda_hat = batched_estimator.fit(2, [1, 3, 5])
+    assert beta_hat.shape == (4, 3)
+    assert f_hat.shape == (4, T, 2)
+    assert lambda_hat.shape == (4, N, 2)
+    assert batched_estimator.convergence.converged.all()
+    for b in range(4):
+        interactive_estimator = InteractiveFixedEffect(Y[b], X[b])
+        expect = interactive_estimator.fit(2, [1, 3, 5])
+        np.testing.assert_allclose(beta_hat[b], expect[0], atol=1e-8)
+        np.testing.assert_allclose(
+            f_hat[b].dot(lambda_hat[b].T), expect[2].dot(expect[3].T), atol=1e-8
+        )
+        assert (
+            batched_estimator.convergence.n_iter[b]
+            == interactive_estimator.convergence.n_iter
+        )
+
+
+def test_fit_max_iter():
+    X, Y = _panel_stack(3, 10, 12)
+    batched_estimator = BatchedInteractiveFixedEffect(Y, X)
+    batched_estimator.fit(2, np.zeros(shape=(3, 3)), tolerance=1e-12, max_iter=3)
+    assert not batched_estimator.convergence.converged.any()
+    np.testing.assert_array_equal(batched_estimator.convergence.n_iter, [3, 3, 3])
+
+
+def test_top_left_singular_vectors_rank_deficient():
+    rng = np.random.default_rng(1)
+    w = np.stack([rng.normal(size=(30, 8)), rng.normal(size=(30, 8))])
+    w[1] = rng.normal(size=(30, 2)).dot(rng.normal(size=(2, 8)))
+    w[1] += 1e-12 * rng.normal(size=(30, 8))
+    batched_estimator = BatchedInteractiveFixedEffect(
+        np.zeros((2, 30, 8)), np.ones((2, 1, 30, 8))
+    )
+    u = batched_estimator._top_left_singular_vectors(w, 3)
+    for b in range(2):
+        np.testing.assert_allclose(u[b].T.dot(u[b]), np.identity(3), atol=1e-10)
+        expect_u = np.linalg.svd(w[b])[0][:, 0:2]
+        np.testing.assert_allclose(
+            np.abs(u[b][:, 0:2].T.dot(expect_u)), np.identity(2), atol=1e-8
+        )
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.model_code import bootstrap as bootstrap_module
+from src.model_code.bootstrap import bootstrap
+
+
+@pytest.fixture
+def factor_input():
+    rng = np.random.default_rng(123)
+    T, N = 20, 30
+    factor = rng.normal(size=(T, 2))
+    lambda_ = rng.normal(size=(N, 2))
+    X = np.stack(
+        [
+            1 + factor.dot(lambda_.T) + rng.normal(size=(T, N)),
+            1 + factor.dot(lambda_.T) + rng.normal(size=(T, N)),
+        ]
+    )
+    Y = np.tensordot([1, 3], X, axes=1) + factor.dot(lambda_.T)
+    Y = Y + rng.normal(scale=2, size=(T, N))
+    return Y, X
+
+
+@pytest.mark.parametrize("method", ["entity", "wild"])
+def test_bootstrap(factor_input, method):
+    Y, X = factor_input
+    result = bootstrap(Y, X, 2, n_replicates=20, method=method, processes=1)
+    assert result.replicates.shape == (20, 2)
+    assert result.n_converged == 20
+    assert np.all(result.se > 0)
+    np.testing.assert_allclose(result.se ** 2, np.diag(result.cov))
+    assert np.all(result.ci_lower < result.beta_hat)
+    assert np.all(result.beta_hat < result.ci_upper)
+
+
+def test_bootstrap_wild_given_beta_hat(factor_input, monkeypatch):
+    Y, X = factor_input
+    beta_hat = np.array([1.2, 2.8])
+    fit_options = {}
+
+    def init_worker(specs, dependent, exog, options):
+        fit_options.update(options)
+        init_worker_base(specs, dependent, exog, options)
+
+    init_worker_base = bootstrap_module._init_worker
+    monkeypatch.setattr(bootstrap_module, "_init_worker", init_worker)
+    result = bootstrap(
+        Y, X, 2, n_replicates=5, method="wild", beta_hat=beta_hat, processes=1
+    )
+    np.testing.assert_array_equal(result.beta_hat, beta_hat)
+    # the factors and loadings are the principal components at the given beta_hat
+    w = Y - np.tensordot(beta_hat, X, axes=1)
+    residual = w - fit_options["f_hat"].dot(fit_options["lambda_hat"].T)
+    eigenvalue = np.linalg.eigvalsh(w.dot(w.T))
+    np.testing.assert_allclose((residual ** 2).sum(), eigenvalue[:-2].sum())
+
+
+def test_bootstrap_processes(factor_input):
+    Y, X = factor_input
+    expect = bootstrap(Y, X, 2, n_replicates=8, method="wild", processes=1)
+    result = bootstrap(Y, X, 2, n_replicates=8, method="wild", processes=2)
+    np.testing.assert_allclose(result.replicates, expect.replicates)
+
+
+def test_bootstrap_unknown_method(factor_input):
+    with pytest.raises(ValueError):
+        bootstrap(*factor_input, 2, method="pairs")
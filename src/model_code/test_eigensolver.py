@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.model_code.eigensolver import choose_eigensolver
+from src.model_code.eigensolver import top_eigenvectors
+from src.model_code.eigensolver import top_left_singular_vectors
+
+
+@pytest.fixture
+def psd_matrix():
+    rng = np.random.default_rng(123)
+    factor = rng.normal(size=(60, 3)) * [5, 3, 2]
+    w = factor.dot(rng.normal(size=(3, 40))) + rng.normal(size=(60, 40))
+    return w.dot(w.T)
+
+
+@pytest.mark.parametrize("solver", ["eigh", "arpack", "randomized"])
+def test_top_eigenvectors(psd_matrix, solver):
+    eigenvalue, v, solver_used = top_eigenvectors(psd_matrix, 3, solver)
+    expect_eigenvalue, expect_v = np.linalg.eigh(psd_matrix)
+    expect_v = expect_v[:, ::-1][:, 0:3]
+    assert solver_used == solver
+    assert v.shape == (60, 3)
+    np.testing.assert_allclose(eigenvalue, expect_eigenvalue[::-1][0:3])
+    # eigenvectors are unique up to sign
+    np.testing.assert_allclose(np.abs(v.T.dot(expect_v)), np.identity(3), atol=1e-6)
+
+
+def test_choose_eigensolver():
+    assert choose_eigensolver(100, 2) == "eigh"
+    assert choose_eigensolver(1000, 200) == "eigh"
+    assert choose_eigensolver(1000, 2) == "arpack"
+    assert choose_eigensolver(10000, 2) == "randomized"
+
+
+def test_top_eigenvectors_fall_back_to_eigh():
+    _, v, solver_used = top_eigenvectors(np.identity(3), 2, "arpack")
+    assert solver_used == "eigh"
+    assert v.shape == (3, 2)
+
+
+def test_top_eigenvectors_unknown_solver(psd_matrix):
+    with pytest.raises(ValueError):
+        top_eigenvectors(psd_matrix, 3, "lapack")
+
+
+@pytest.mark.parametrize("shape", [(30, 8), (8, 30)])
+@pytest.mark.parametrize("side", ["T", "N", "svd"])
+def test_top_left_singular_vectors(shape, side):
+    w = np.random.default_rng(1).normal(size=shape)
+    u, side_used, _ = top_left_singular_vectors(w, 3, side)
+    expect_u = np.linalg.svd(w)[0][:, 0:3]
+    assert side_used == side
+    np.testing.assert_allclose(u.T.dot(u), np.identity(3), atol=1e-10)
+    np.testing.assert_allclose(np.abs(u.T.dot(expect_u)), np.identity(3), atol=1e-8)
+
+
+def test_top_left_singular_vectors_auto_side():
+    w = np.random.default_rng(1).normal(size=(30, 8))
+    assert top_left_singular_vectors(w, 2)[1] == "N"
+    assert top_left_singular_vectors(w.T, 2)[1] == "T"
+
+
+def test_top_left_singular_vectors_rank_deficient():
+    rng = np.random.default_rng(1)
+    w = rng.normal(size=(30, 2)).dot(rng.normal(size=(2, 8)))
+    w += 1e-12 * rng.normal(size=w.shape)
+    u, side_used, _ = top_left_singular_vectors(w, 3, "N")
+    assert side_used == "T"
+    np.testing.assert_allclose(u.T.dot(u), np.identity(3), atol=1e-10)
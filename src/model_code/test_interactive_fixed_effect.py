@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+from src.model_code.panel_regressors import PanelRegressors
 
 
 @pytest.fixture
@@ -106,6 +107,26 @@ def no_singular_input():
     return input
 
 
+@pytest.fixture
+def factor_input():
+    rng = np.random.default_rng(123)
+    T, N = 20, 30
+    factor = rng.normal(size=(T, 2))
+    lambda_ = rng.normal(size=(N, 2))
+    X = np.stack(
+        [
+            1 + factor.dot(lambda_.T) + rng.normal(size=(T, N)),
+            1 + factor.dot(lambda_.T) + rng.normal(size=(T, N)),
+            np.ones(shape=(T, N)),
+        ]
+    )
+    Y = np.tensordot([1, 3, 5], X, axes=1) + factor.dot(lambda_.T)
+    Y = Y + rng.normal(scale=2, size=(T, N))
+    beta = (1, 3, 5)
+    input = {"X": X, "Y": Y, "beta": beta}
+    return input
+
+
 def test_fit_beta_hat(normal_input):
     interactive_estimator = InteractiveFixedEffect(normal_input["Y"], normal_input["X"])
     beta_hat, beta_hat_list, f_hat, lambda_hat = interactive_estimator.fit(
@@ -200,3 +221,465 @@ def test_calculate_sde(no_singular_input):
         ]
     )
     np.testing.assert_array_almost_equal(sde, expect)
+
+
+@pytest.mark.parametrize("input_name", ["normal_input", "no_singular_input"])
+def test_fit_batched_engine_same_as_loop(input_name, request):
+    input = request.getfixturevalue(input_name)
+    loop_estimator = InteractiveFixedEffect(input["Y"], input["X"], engine="loop")
+    batched_estimator = InteractiveFixedEffect(input["Y"], input["X"], engine="batched")
+    loop_result = loop_estimator.fit(r=2, beta_hat_0=input["beta"])
+    batched_result = batched_estimator.fit(r=2, beta_hat_0=input["beta"])
+    np.testing.assert_allclose(batched_result[0], loop_result[0], atol=1e-8)
+    np.testing.assert_allclose(batched_result[1], loop_result[1], atol=1e-8)
+
+
+def test_calculate_beta_hat_batched(normal_input):
+    interactive_estimator = InteractiveFixedEffect(normal_input["Y"], normal_input["X"])
+    f_hat = np.array(
+        [[1.5482942, 0.7668864], [0.3597737, -0.9481272], [0.6880028, -1.2300162]]
+    )
+    lambda_hat = np.array(
+        [
+            [-1.6331689, 0.7396594],
+            [0.1741834, 1.7876252],
+            [-2.8125904, -0.1033363],
+            [-1.5566757, -0.3892726],
+        ]
+    )
+    beta_hat = interactive_estimator._calculate_beta_hat_batched(f_hat, lambda_hat)
+    expect = np.array([[1.094433, 2.897426, 4.978414, 1.978000, 3.971552]])
+    np.testing.assert_array_almost_equal(beta_hat, expect)
+
+
+def test_unknown_engine(normal_input):
+    with pytest.raises(ValueError):
+        InteractiveFixedEffect(normal_input["Y"], normal_input["X"], engine="fast")
+
+
+def test_invariants_reused_between_fits(no_singular_input):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    interactive_estimator.fit(r=1, beta_hat_0=no_singular_input["beta"])
+    invariants = interactive_estimator._get_invariants()
+    interactive_estimator.fit(r=2, beta_hat_0=no_singular_input["beta"])
+    assert interactive_estimator._get_invariants() is invariants
+    expect_A = sum(X[:, :, i].dot(X[:, :, i].T) for i in range(X.shape[2]))
+    expect_xy = sum(X[:, :, i].dot(Y[:, i]) for i in range(X.shape[2]))
+    np.testing.assert_array_almost_equal(invariants["A"], expect_A)
+    np.testing.assert_array_almost_equal(invariants["xy"], expect_xy)
+
+
+@pytest.mark.parametrize("eigensolver", ["arpack", "randomized"])
+def test_fit_truncated_eigensolver(no_singular_input, eigensolver):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    full = InteractiveFixedEffect(Y, X, eigensolver="eigh")
+    truncated = InteractiveFixedEffect(Y, X, eigensolver=eigensolver)
+    expect_beta_hat = full.fit(r=2, beta_hat_0=no_singular_input["beta"])[0]
+    beta_hat = truncated.fit(r=2, beta_hat_0=no_singular_input["beta"])[0]
+    assert full.eigensolver_used == "eigh"
+    assert truncated.eigensolver_used == eigensolver
+    np.testing.assert_allclose(beta_hat, expect_beta_hat, atol=1e-6)
+
+
+@pytest.mark.parametrize("factor_side", ["T", "N", "svd"])
+def test_fit_factor_side(no_singular_input, factor_side):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    expect = InteractiveFixedEffect(Y, X, engine="loop").fit(
+        r=2, beta_hat_0=no_singular_input["beta"]
+    )
+    interactive_estimator = InteractiveFixedEffect(Y, X, factor_side=factor_side)
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(
+        r=2, beta_hat_0=no_singular_input["beta"]
+    )
+    assert interactive_estimator.factor_side_used == factor_side
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-8)
+    np.testing.assert_allclose(f_hat.T.dot(f_hat) / 6, np.identity(2), atol=1e-10)
+    np.testing.assert_allclose(
+        f_hat.dot(lambda_hat.T), expect[2].dot(expect[3].T), atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("warm_start", [True, False])
+def test_fit_path(factor_input, warm_start):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    path = interactive_estimator.fit_path(
+        [1, 2], factor_input["beta"], warm_start=warm_start
+    )
+    assert [result.r for result in path] == [1, 2]
+    start_value = path[0].beta_hat if warm_start else factor_input["beta"]
+    beta_hat, beta_hat_list, f_hat, _ = interactive_estimator.fit(2, start_value)
+    np.testing.assert_array_almost_equal(path[1].beta_hat, beta_hat)
+    assert path[1].f_hat.shape == (20, 2)
+    assert path[1].lambda_hat.shape == (30, 2)
+    assert path[1].convergence.converged
+    assert path[1].convergence.n_iter == len(beta_hat_list) - 1
+
+
+@pytest.mark.parametrize("acceleration", ["anderson", "squarem"])
+def test_fit_acceleration(no_singular_input, acceleration):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    expect = interactive_estimator.fit(2, no_singular_input["beta"], 1e-7)
+    n_iter_plain = interactive_estimator.convergence.n_iter
+    beta_hat, beta_hat_list, _, _ = interactive_estimator.fit(
+        2, no_singular_input["beta"], 1e-7, acceleration=acceleration
+    )
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-5)
+    assert interactive_estimator.convergence.n_iter == len(beta_hat_list) - 1
+    assert interactive_estimator.convergence.n_iter < n_iter_plain / 4
+
+
+def test_fit_convergence(no_singular_input):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    beta_hat, beta_hat_list, f_hat, lambda_hat = interactive_estimator.fit(
+        2, no_singular_input["beta"]
+    )
+    convergence = interactive_estimator.convergence
+    assert convergence.converged
+    assert convergence.n_iter == len(beta_hat_list) - 1
+    assert convergence.step_norm <= 0.0001
+    assert convergence.elapsed >= 0
+    residual = Y - np.tensordot(beta_hat_list[-2], X, axes=1) - f_hat.dot(lambda_hat.T)
+    np.testing.assert_almost_equal(convergence.objective, (residual ** 2).sum())
+
+
+def test_fit_max_iter(no_singular_input):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    beta_hat, beta_hat_list, _, _ = interactive_estimator.fit(
+        2, no_singular_input["beta"], max_iter=5
+    )
+    convergence = interactive_estimator.convergence
+    assert not convergence.converged
+    assert convergence.n_iter == 5
+    assert convergence.step_norm > 0.0001
+    np.testing.assert_array_equal(beta_hat, beta_hat_list[-1])
+
+
+def test_fit_max_time(no_singular_input):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    interactive_estimator.fit(2, no_singular_input["beta"], 1e-12, max_time=0)
+    assert not interactive_estimator.convergence.converged
+    assert interactive_estimator.convergence.n_iter == 1
+
+
+@pytest.mark.parametrize("history", ["off", 1, 3, 500])
+def test_fit_history(no_singular_input, history):
+    X = no_singular_input["X"]
+    Y = no_singular_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    expect_beta_hat, expect_list, _, _ = interactive_estimator.fit(
+        2, no_singular_input["beta"]
+    )
+    assert expect_list.shape == (interactive_estimator.convergence.n_iter + 1, 5)
+    np.testing.assert_array_equal(expect_list[0], no_singular_input["beta"])
+    beta_hat, beta_hat_list, _, _ = interactive_estimator.fit(
+        2, no_singular_input["beta"], history=history
+    )
+    np.testing.assert_array_equal(beta_hat, expect_beta_hat)
+    if history == "off":
+        assert beta_hat_list is None
+    else:
+        np.testing.assert_array_equal(beta_hat_list, expect_list[-history:])
+
+
+def test_fit_unknown_history(normal_input):
+    interactive_estimator = InteractiveFixedEffect(normal_input["Y"], normal_input["X"])
+    with pytest.raises(ValueError):
+        interactive_estimator.fit(2, history="last")
+
+
+def test_fit_float32(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    expect_beta_hat = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"])[0]
+    interactive_estimator = InteractiveFixedEffect(Y, X, dtype=np.float32)
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(2, factor_input["beta"])
+    assert f_hat.dtype == np.float32
+    assert lambda_hat.dtype == np.float32
+    assert interactive_estimator.refinement is None
+    np.testing.assert_allclose(beta_hat, expect_beta_hat, atol=1e-3)
+
+
+def test_fit_float32_refine(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+    interactive_estimator = InteractiveFixedEffect(Y, X, dtype=np.float32)
+    assert interactive_estimator._exog.dtype == np.float32
+    with pytest.raises(ValueError):
+        interactive_estimator.fit(2, factor_input["beta"], 1e-8, refine=True)
+    beta_hat, _, f_hat, _ = interactive_estimator.fit(
+        2, factor_input["beta"], 1e-8, refine=(Y, X)
+    )
+    refinement = interactive_estimator.refinement
+    assert f_hat.dtype == np.float64
+    assert refinement.convergence.converged
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-7)
+    np.testing.assert_allclose(
+        refinement.max_abs_diff,
+        np.max(np.abs(beta_hat - refinement.beta_hat_low_precision)),
+    )
+
+
+def test_fit_float32_refine_memmap(factor_input, tmp_path):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    np.save(tmp_path / "Y.npy", Y)
+    np.save(tmp_path / "X.npy", X)
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+    interactive_estimator = InteractiveFixedEffect(
+        tmp_path / "Y.npy", tmp_path / "X.npy", dtype=np.float32
+    )
+    beta_hat = interactive_estimator.fit(2, factor_input["beta"], 1e-8, refine=True)[0]
+    assert interactive_estimator.refinement.convergence.converged
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-7)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 30])
+def test_fit_chunked(factor_input, chunk_size):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+    interactive_estimator = InteractiveFixedEffect(Y, X, chunk_size=chunk_size)
+    beta_hat, beta_hat_list, f_hat, lambda_hat = interactive_estimator.fit(
+        2, factor_input["beta"], 1e-8
+    )
+    assert interactive_estimator.factor_side_used == "T"
+    assert lambda_hat.shape == (30, 2)
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-9)
+    np.testing.assert_allclose(beta_hat_list, expect[1], atol=1e-9)
+    np.testing.assert_allclose(
+        f_hat.dot(lambda_hat.T), expect[2].dot(expect[3].T), atol=1e-8
+    )
+
+
+def test_fit_memmap(factor_input, tmp_path):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    np.save(tmp_path / "Y.npy", Y)
+    np.save(tmp_path / "X.npy", X)
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+    interactive_estimator = InteractiveFixedEffect(
+        tmp_path / "Y.npy", str(tmp_path / "X.npy")
+    )
+    assert isinstance(interactive_estimator._exog, np.memmap)
+    assert interactive_estimator.chunk_size >= 30
+    beta_hat = interactive_estimator.fit(2, factor_input["beta"], 1e-8)[0]
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-9)
+
+
+@pytest.mark.parametrize("memmapped", ["dependent", "exog"])
+def test_fit_memmap_mixed(factor_input, tmp_path, memmapped):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    np.save(tmp_path / "Y.npy", Y)
+    np.save(tmp_path / "X.npy", X)
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+    if memmapped == "dependent":
+        interactive_estimator = InteractiveFixedEffect(tmp_path / "Y.npy", X)
+    else:
+        interactive_estimator = InteractiveFixedEffect(Y, tmp_path / "X.npy")
+    assert interactive_estimator.chunk_size >= 30
+    beta_hat = interactive_estimator.fit(2, factor_input["beta"], 1e-8)[0]
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-9)
+
+
+def test_fit_chunked_factor_side(factor_input):
+    with pytest.raises(ValueError):
+        InteractiveFixedEffect(
+            factor_input["Y"], factor_input["X"], factor_side="N", chunk_size=5
+        )
+
+
+def test_fit_chunk_source(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    expect = InteractiveFixedEffect(Y, X).fit(2, factor_input["beta"], 1e-8)
+
+    def read_chunks():
+        for start in range(0, 30, 8):
+            yield Y[:, start : start + 8], X[:, :, start : start + 8]
+
+    for source in [read_chunks, list(read_chunks())]:
+        interactive_estimator = InteractiveFixedEffect(source)
+        assert (interactive_estimator.p, interactive_estimator.T) == (3, 20)
+        assert interactive_estimator.N == 30
+        beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(
+            2, factor_input["beta"], 1e-8
+        )
+        np.testing.assert_allclose(beta_hat, expect[0], atol=1e-9)
+        np.testing.assert_allclose(
+            f_hat.dot(lambda_hat.T), expect[2].dot(expect[3].T), atol=1e-8
+        )
+
+
+def test_fit_chunk_source_errors(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    with pytest.raises(ValueError):
+        InteractiveFixedEffect(iter([(Y, X)]))
+    with pytest.raises(ValueError):
+        InteractiveFixedEffect([(Y, X)], engine="loop")
+    with pytest.raises(ValueError):
+        InteractiveFixedEffect([(Y, X), (Y[1:], X[:, 1:])])
+
+
+def test_calculate_sde_chunked(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(2, tolerance=1e-8)
+    expect = interactive_estimator.calculate_sde(beta_hat, f_hat, lambda_hat)
+    chunks = [(Y[:, 0:7], X[:, :, 0:7]), (Y[:, 7:], X[:, :, 7:])]
+    for chunked_estimator in [
+        InteractiveFixedEffect(Y, X, chunk_size=4),
+        InteractiveFixedEffect(chunks),
+    ]:
+        sde = chunked_estimator.calculate_sde(beta_hat, f_hat, lambda_hat)
+        np.testing.assert_allclose(sde, expect, rtol=1e-10)
+
+
+def test_update(factor_input):
+    # without the constant, which is hard to separate from the factors
+    X = factor_input["X"][0:2]
+    Y = factor_input["Y"] - 5
+    interactive_estimator = InteractiveFixedEffect(Y[0:17], X[:, 0:17])
+    beta_hat_previous = interactive_estimator.fit(2, tolerance=1e-8)[0]
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.update(
+        Y[17:], X[:, 17:], tolerance=1e-8
+    )
+    update = interactive_estimator.last_update
+    assert interactive_estimator.T == 20
+    assert f_hat.shape == (20, 2)
+    assert update.n_new == 3
+    np.testing.assert_allclose(update.beta_hat_previous, beta_hat_previous)
+    np.testing.assert_allclose(
+        update.step_norm, np.linalg.norm(beta_hat - beta_hat_previous)
+    )
+    # same solution as a refit of all periods from the previous estimate
+    refit_estimator = InteractiveFixedEffect(Y, X)
+    expect = refit_estimator.fit(2, beta_hat_previous, tolerance=1e-8)
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-6)
+    assert update.convergence.n_iter <= refit_estimator.convergence.n_iter
+    invariants = interactive_estimator._invariants
+    np.testing.assert_allclose(
+        invariants["A"], np.tensordot(X, X, axes=([1, 2], [1, 2]))
+    )
+    np.testing.assert_allclose(
+        invariants["xy"], np.tensordot(X, Y, axes=([1, 2], [0, 1]))
+    )
+
+
+def test_append_entities(factor_input):
+    X = factor_input["X"][0:2]
+    Y = factor_input["Y"] - 5
+    interactive_estimator = InteractiveFixedEffect(Y[:, 0:25], X[:, :, 0:25])
+    beta_hat_previous = interactive_estimator.fit(2, tolerance=1e-8)[0]
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.append_entities(
+        Y[:, 25:], X[:, :, 25:], tolerance=1e-8
+    )
+    update = interactive_estimator.last_update
+    assert interactive_estimator.N == 30
+    assert lambda_hat.shape == (30, 2)
+    assert update.n_new == 5
+    refit_estimator = InteractiveFixedEffect(Y, X)
+    expect = refit_estimator.fit(2, beta_hat_previous, tolerance=1e-8)
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-6)
+    invariants = interactive_estimator._invariants
+    assert invariants["N"] == 30
+    np.testing.assert_allclose(
+        invariants["A"], np.tensordot(X, X, axes=([1, 2], [1, 2]))
+    )
+
+
+def test_update_errors(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y[0:17], X[:, 0:17])
+    with pytest.raises(ValueError):
+        interactive_estimator.update(Y[17:], X[:, 17:])
+    interactive_estimator.fit(2)
+    with pytest.raises(ValueError):
+        interactive_estimator.update(Y[17:, 1:], X[:, 17:, 1:])
+    with pytest.raises(ValueError):
+        interactive_estimator.append_entities(Y[:, 0:2], X[:, :, 0:2])
+
+
+def test_fit_multistart(factor_input):
+    X = factor_input["X"][0:2]
+    Y = factor_input["Y"] - 5
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    beta_hat, beta_hat_list, f_hat, lambda_hat = interactive_estimator.fit_multistart(
+        2, n_random=2, tolerance=1e-8, check_every=20, threads=2
+    )
+    starts = interactive_estimator.starts
+    assert beta_hat_list is None
+    assert [start.name for start in starts] == [
+        "pooled",
+        "within",
+        "zeros",
+        "random.1",
+        "random.2",
+    ]
+    best = min(starts, key=lambda start: start.objective)
+    np.testing.assert_allclose(beta_hat, best.beta_hat)
+    assert interactive_estimator.convergence.n_iter == best.n_iter
+    assert all(start.converged or start.stopped_early for start in starts)
+    # the best start is a fixed point of a plain fit
+    expect = InteractiveFixedEffect(Y, X).fit(2, beta_hat, tolerance=1e-8)
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-6)
+    np.testing.assert_allclose(
+        f_hat.dot(lambda_hat.T), expect[2].dot(expect[3].T), atol=1e-6
+    )
+
+
+def test_fit_multistart_errors(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    interactive_estimator = InteractiveFixedEffect(Y, X)
+    with pytest.raises(ValueError):
+        interactive_estimator.fit_multistart(2, starts=["ols"])
+    chunked_estimator = InteractiveFixedEffect([(Y, X)])
+    with pytest.raises(ValueError):
+        chunked_estimator.fit_multistart(2, starts=["within"])
+
+
+def test_fit_panel_regressors(factor_input):
+    X = factor_input["X"]
+    Y = factor_input["Y"]
+    compact = PanelRegressors.from_dense(X)
+    assert compact.kinds == ("full", "full", "constant")
+    expect = InteractiveFixedEffect(Y, X).fit(2, tolerance=1e-8, max_iter=100)
+    interactive_estimator = InteractiveFixedEffect(Y, compact)
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(
+        2, tolerance=1e-8, max_iter=100
+    )
+    assert isinstance(interactive_estimator._exog, PanelRegressors)
+    np.testing.assert_allclose(beta_hat, expect[0], rtol=1e-8)
+    invariants = interactive_estimator._invariants
+    np.testing.assert_allclose(
+        invariants["A"], np.tensordot(X, X, axes=([1, 2], [1, 2]))
+    )
+    sde = interactive_estimator.calculate_sde(beta_hat, f_hat, lambda_hat)
+    sde_dense = InteractiveFixedEffect(Y, X).calculate_sde(beta_hat, f_hat, lambda_hat)
+    np.testing.assert_allclose(sde, sde_dense, rtol=1e-10)
+    # the engine "loop" and chunks use dense data
+    loop_estimator = InteractiveFixedEffect(Y, compact, engine="loop")
+    assert isinstance(loop_estimator._exog, np.ndarray)
+    chunked_estimator = InteractiveFixedEffect(Y, compact, chunk_size=7)
+    np.testing.assert_allclose(
+        chunked_estimator.fit(2, tolerance=1e-8, max_iter=100)[0], beta_hat, rtol=1e-8
+    )
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+from src.model_code.kernels import available_backends
+from src.model_code.kernels import get_kernels
+from src.model_code.kernels import LOOP_KERNELS
+from src.model_code.kernels import NUMPY_KERNELS
+
+
+@pytest.fixture
+def kernel_input():
+    rng = np.random.default_rng(0)
+    p, T, N, r = 3, 6, 5, 2
+    return {
+        "dependent": rng.normal(size=(T, N)),
+        "exog": rng.normal(size=(p, T, N)),
+        "beta_hat": rng.normal(size=p),
+        "f_hat": rng.normal(size=(T, r)),
+        "lambda_hat": rng.normal(size=(N, r)),
+        "xy": rng.normal(size=p),
+        "sita_square": rng.uniform(size=N),
+    }
+
+
+@pytest.mark.parametrize("kernels", [LOOP_KERNELS, NUMPY_KERNELS])
+def test_kernels(kernel_input, kernels):
+    d = kernel_input
+    w = kernels.residual(d["dependent"], d["exog"], d["beta_hat"])
+    np.testing.assert_allclose(
+        w, d["dependent"] - np.einsum("p,ptn->tn", d["beta_hat"], d["exog"])
+    )
+    np.testing.assert_allclose(
+        kernels.loadings(w, d["f_hat"]), w.T.dot(d["f_hat"]) / 6
+    )
+    expect = d["xy"] - np.einsum(
+        "ptn,tn->p", d["exog"], d["f_hat"].dot(d["lambda_hat"].T)
+    )
+    np.testing.assert_allclose(
+        kernels.beta_rhs(d["xy"], d["exog"], d["f_hat"], d["lambda_hat"]), expect
+    )
+    D0, D1 = kernels.sde_sums(d["exog"], d["sita_square"])
+    np.testing.assert_allclose(D0, np.einsum("ptn,qtn->pq", d["exog"], d["exog"]))
+    np.testing.assert_allclose(
+        D1, np.einsum("ptn,qtn,n->pq", d["exog"], d["exog"], d["sita_square"])
+    )
+
+
+def test_get_kernels_unknown_backend():
+    with pytest.raises(ValueError):
+        get_kernels("cython")
+
+
+def test_numba_backend(kernel_input):
+    pytest.importorskip("numba")
+    assert "numba" in available_backends()
+    Y = kernel_input["dependent"]
+    X = kernel_input["exog"]
+    expect = InteractiveFixedEffect(Y, X).fit(1, tolerance=1e-8)
+    interactive_estimator = InteractiveFixedEffect(Y, X, backend="numba")
+    beta_hat, _, f_hat, lambda_hat = interactive_estimator.fit(1, tolerance=1e-8)
+    np.testing.assert_allclose(beta_hat, expect[0], atol=1e-8)
+    np.testing.assert_allclose(
+        interactive_estimator.calculate_sde(beta_hat, f_hat, lambda_hat),
+        InteractiveFixedEffect(Y, X).calculate_sde(beta_hat, f_hat, lambda_hat),
+    )
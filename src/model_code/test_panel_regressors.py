@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.model_code.panel_regressors import PanelRegressors
+
+
+@pytest.fixture
+def regressors():
+    rng = np.random.default_rng(0)
+    T, N = 7, 5
+    columns = [
+        ("full", rng.normal(size=(T, N))),
+        ("constant", 1.0),
+        ("entity", rng.normal(size=N)),
+        ("full", rng.normal(size=(T, N))),
+        ("time", rng.normal(size=T)),
+        ("entity", rng.normal(size=N)),
+    ]
+    X = PanelRegressors(columns)
+    return X, np.asarray(X)
+
+
+def test_dense(regressors):
+    X, dense = regressors
+    assert X.shape == dense.shape == (6, 7, 5)
+    np.testing.assert_array_equal(dense[1], 1)
+    np.testing.assert_array_equal(dense[2], np.tile(X.columns[2][1], (7, 1)))
+    np.testing.assert_array_equal(dense[4], np.tile(X.columns[4][1], (5, 1)).T)
+    assert X.nbytes < dense.nbytes / 2
+
+
+def test_from_dense(regressors):
+    X, dense = regressors
+    detected = PanelRegressors.from_dense(dense)
+    assert detected.kinds == X.kinds
+    np.testing.assert_array_equal(np.asarray(detected), dense)
+
+
+def test_cross_products(regressors):
+    X, dense = regressors
+    rng = np.random.default_rng(1)
+    beta = rng.normal(size=6)
+    M = rng.normal(size=(7, 5))
+    np.testing.assert_allclose(X.combine(beta), np.tensordot(beta, dense, axes=1))
+    np.testing.assert_allclose(
+        X.residual(M, beta), M - np.tensordot(beta, dense, axes=1)
+    )
+    np.testing.assert_allclose(
+        X.cross(M), np.tensordot(dense, M, axes=([1, 2], [0, 1]))
+    )
+    np.testing.assert_allclose(
+        X.gram(), np.tensordot(dense, dense, axes=([1, 2], [1, 2]))
+    )
+
+
+def test_getitem(regressors):
+    X, dense = regressors
+    np.testing.assert_array_equal(X[3], dense[3])
+    selected = X[1:5, 2:6, [0, 3]]
+    assert isinstance(selected, PanelRegressors)
+    np.testing.assert_array_equal(
+        np.asarray(selected), dense[1:5, 2:6][:, :, [0, 3]]
+    )
+    np.testing.assert_array_equal(np.asarray(X[:, :, 1:4]), dense[:, :, 1:4])
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        PanelRegressors([("row", np.ones(3))])
+    with pytest.raises(ValueError):
+        PanelRegressors([("entity", np.ones((3, 3)))])
+    with pytest.raises(ValueError):
+        PanelRegressors([("full", np.ones((3, 4))), ("entity", np.ones(3))])
+    with pytest.raises(ValueError):
+        PanelRegressors([("constant", 1)])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.model_code.panel_source import ArrayPanelSource
+from src.model_code.panel_source import as_chunk_source
+from src.model_code.panel_source import ChunkSource
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    Y = rng.normal(size=(4, 10))
+    X = rng.normal(size=(2, 4, 10))
+    return Y, X
+
+
+def test_array_panel_source_chunks(panel):
+    Y, X = panel
+    source = ArrayPanelSource(Y, X, chunk_size=3)
+    chunks = list(source)
+    assert [y.shape[1] for y, _ in chunks] == [3, 3, 3, 1]
+    np.testing.assert_array_equal(np.concatenate([y for y, _ in chunks], axis=1), Y)
+    np.testing.assert_array_equal(np.concatenate([x for _, x in chunks], axis=2), X)
+    # the source can be iterated again
+    assert len(list(source)) == 4
+
+
+def test_array_panel_source_npy(panel, tmp_path):
+    Y, X = panel
+    np.save(tmp_path / "Y.npy", Y)
+    np.save(tmp_path / "X.npy", X)
+    source = ArrayPanelSource(tmp_path / "Y.npy", tmp_path / "X.npy")
+    assert isinstance(source.exog, np.memmap)
+    assert (source.p, source.T, source.N) == (2, 4, 10)
+    chunks = list(source)
+    assert len(chunks) == 1
+    np.testing.assert_array_equal(chunks[0][1], X)
+
+
+def test_array_panel_source_shape(panel):
+    Y, X = panel
+    with pytest.raises(ValueError):
+        ArrayPanelSource(Y[:, 1:], X)
+    with pytest.raises(ValueError):
+        ArrayPanelSource(Y, X, chunk_size=0)
+
+
+def test_chunk_source(panel):
+    Y, X = panel
+
+    def read_chunks():
+        yield Y[:, 0:5], X[:, :, 0:5]
+        yield Y[:, 5:], X[:, :, 5:]
+
+    source = ChunkSource(read_chunks)
+    assert len(list(source)) == 2
+    assert len(list(source)) == 2
+    with pytest.raises(ValueError):
+        ChunkSource(read_chunks())
+
+
+def test_as_chunk_source(panel):
+    source = ArrayPanelSource(*panel)
+    assert as_chunk_source(source) is source
+    assert isinstance(as_chunk_source([panel]), ChunkSource)
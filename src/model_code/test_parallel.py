@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np  # noqa: F401, loads BLAS for threadpool_info
+import pytest
+from threadpoolctl import threadpool_info
+
+from src.model_code.parallel import BLAS_THREAD_VARIABLES
+from src.model_code.parallel import choose_thread_split
+from src.model_code.parallel import make_pool
+from src.model_code.parallel import resolve_thread_split
+
+
+@pytest.mark.parametrize(
+    "all_N, all_T, n_tasks, cores, expect",
+    [
+        ([10, 20, 50], [10, 20, 50], 200, 64, (64, 1)),
+        ([1000], [1000], 200, 64, (16, 4)),
+        ([300], [300], 200, 64, (32, 2)),
+        ([10], [10], 4, 64, (4, 1)),
+        ([1000], [1000], 4, 64, (4, 4)),
+        ([1000], [1000], 200, 1, (1, 1)),
+    ],
+)
+def test_choose_thread_split(all_N, all_T, n_tasks, cores, expect):
+    assert choose_thread_split(all_N, all_T, n_tasks, cores) == expect
+
+
+def test_resolve_thread_split():
+    cores = os.cpu_count()
+    assert resolve_thread_split(1, None, [10], [10]) == (1, cores)
+    assert resolve_thread_split(None, 1, [10], [10]) == (cores, 1)
+    assert resolve_thread_split(3, 2, [10], [10]) == (3, 2)
+
+
+def _blas_threads(_):
+    return [
+        info["num_threads"] for info in threadpool_info() if info["user_api"] == "blas"
+    ]
+
+
+def test_make_pool():
+    with make_pool(2, 1) as pool:
+        blas_threads = pool.map(_blas_threads, range(2))
+    assert all(threads and set(threads) == {1} for threads in blas_threads)
+
+
+def test_limit_blas_threads(monkeypatch):
+    for variable in BLAS_THREAD_VARIABLES:
+        monkeypatch.setenv(variable, str(os.cpu_count()))
+    # the cap stays for the rest of a process, so check it in a new one
+    code = (
+        "import json, os; import numpy; from threadpoolctl import threadpool_info; "
+        "from src.model_code import parallel; parallel.limit_blas_threads(1); "
+        "print(json.dumps([[os.environ[v] for v in parallel.BLAS_THREAD_VARIABLES], "
+        "[i['num_threads'] for i in threadpool_info() if i['user_api'] == 'blas']]))"
+    )
+    variables, blas_threads = json.loads(
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parents[2],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    )
+    assert variables == ["1"] * len(BLAS_THREAD_VARIABLES)
+    assert blas_threads and set(blas_threads) == {1}
@@ -0,0 +1,55 @@
+"""
+Time the kernel backends of the estimators side by side. Run as
+`python -m src.sandbox.benchmark_backends`. Backends which can not be imported are
+skipped, the first call of a compiled backend is excluded from the timings.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from src.model_code.factor_estimator import FactorEstimator
+from src.model_code.interactive_fixed_effect import InteractiveFixedEffect
+from src.model_code.kernels import available_backends
+
+sizes = [(50, 50), (100, 100), (200, 1000)]  # (T, N)
+r = 2
+repeat = 3
+
+
+def make_panel(T, N, p=3, seed=0):
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(size=(T, r))
+    lambda_ = rng.normal(size=(N, r))
+    X = rng.normal(size=(p, T, N)) + factor.dot(lambda_.T)
+    Y = np.tensordot(np.arange(1, p + 1), X, axes=1) + factor.dot(lambda_.T)
+    return Y + rng.normal(size=(T, N)), X
+
+
+def time_backend(backend, Y, X):
+    estimator = InteractiveFixedEffect(Y, X, backend=backend)
+    beta_hat, _, f_hat, lambda_hat = estimator.fit(r, history="off")
+    residual = Y - np.tensordot(beta_hat, X, axes=1)
+    factor_estimator = FactorEstimator(residual, backend=backend)
+    # the calls above and the first calls below compile the kernels of "numba"
+    estimator.calculate_sde(beta_hat, f_hat, lambda_hat)
+    factor_estimator.r_hat(8, "IC", 1)
+    timings = {
+        "fit": lambda: estimator.fit(r, history="off"),
+        "calculate_sde": lambda: estimator.calculate_sde(beta_hat, f_hat, lambda_hat),
+        "r_hat": lambda: factor_estimator.r_hat(8, "IC", 1),
+    }
+    return {
+        name: min(timeit.repeat(func, number=1, repeat=repeat))
+        for name, func in timings.items()
+    }
+
+
+if __name__ == "__main__":
+    rows = []
+    for T, N in sizes:
+        Y, X = make_panel(T, N)
+        for backend in available_backends():
+            timings = time_backend(backend, Y, X)
+            rows.append({"T": T, "N": N, "backend": backend, **timings})
+    print(pd.DataFrame(rows).set_index(["T", "N", "backend"]).round(4))
@@ -1,13 +1,10 @@
 import profile
 
-import numpy as np
-
 from src.analysis.monte_carlo_dgp import (
     dgp_interactive_fixed_effects_model_with_common_and_time_invariant,
 )
 from src.analysis.simulation import simulation_coefficient  # noqa:F401
 
-np.random.seed(123)
 dgp_func = dgp_interactive_fixed_effects_model_with_common_and_time_invariant
 all_N = [10, 20, 50]
 all_T = [10, 20, 50]
@@ -28,6 +25,7 @@ beta_true = {"beta1": 1, "beta2": 3, "mu": 5, "gamma": 2, "delta": 4}
 #     r=r,
 #     interactive_start_value_effect=interactive_start_value_effect,
 #     within_effect=within_effect,
+#     seed=123,
 #     **beta_true
 # )
 # print(data)
@@ -43,6 +41,7 @@ if __name__ == "__main__":
         r=r,
         interactive_start_value_effect=interactive_start_value_effect,
         within_effect=within_effect,
+        seed=123,
         **beta_true
     )"""
     )